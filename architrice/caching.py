@@ -1,5 +1,5 @@
-import asyncio
 import concurrent.futures
+import itertools
 import logging
 import os
 import typing
@@ -10,22 +10,37 @@ from . import sources
 from . import targets
 from . import utils
 
+from .targets import atomic_writer
+from .targets import card_info
+from .targets import zip_archive
 
-class DeckFile(database.StoredObject, deckreprs.DeckUpdate):
-    """A DeckFile represents the last time a local Deck file was updated."""
+
+class DeckFile(database.StoredObject):
+    """A DeckFile represents the last time a local Deck file was updated.
+
+    It has the attributes of a deckreprs.DeckUpdate, but doesn't subclass it as
+    both classes use __slots__."""
+
+    __slots__ = ("deck", "_updated", "file_name", "output")
+
+    updated = database.TrackedColumn()
 
     def __init__(self, deck, updated, file_name, output, db_id=None):
-        database.StoredObject.__init__(self, "deck_files", db_id)
-        deckreprs.DeckUpdate.__init__(self, deck, updated)
+        super().__init__("deck_files", db_id)
+        self.deck: deckreprs.DeckDetails = deck
+        self.updated: int = updated
         self.file_name: str = file_name
         self.output: Output = output
 
     def __repr__(self):
         return (
-            super().__repr__().replace("<DeckUpdate", "<DeckFile")[:-1]
-            + f" file_name={self.file_name} output={self.output} id={self._id}>"
+            f"<DeckFile deck={repr(self.deck)} updated={self.updated} "
+            f"file_name={self.file_name} output={self.output} id={self._id}>"
         )
 
+    def update(self):
+        self.updated = utils.time_now()
+
 
 class OutputDir(database.StoredObject):
     # Keep a dict mapping path to OutputDir so that only one object exists for
@@ -37,14 +52,76 @@ class OutputDir(database.StoredObject):
         self.path: str = path
 
         # maps hash(Output, DeckDetails) to DeckFile
-        self.deck_files: typing.Dict[int, DeckFile] = {}
+        self._deck_files: typing.Dict[int, DeckFile] = {}
+
+        # Outputs whose DeckFiles are in the database but haven't been loaded
+        # yet. They are loaded the first time deck_files is accessed, so that
+        # modes which don't touch DeckFiles don't pay to load them.
+        self.pending_outputs: typing.List[Output] = []
+
+        # Index of the file names used by deck_files, mapping file name to the
+        # number of DeckFiles using it, and a map from suggested file name to
+        # the next suffix to try for it, so that allocating a unique name
+        # doesn't need to scan every DeckFile.
+        self.file_names: typing.Dict[str, int] = {}
+        self.file_name_suffixes: typing.Dict[str, int] = {}
+
+        # Snapshot of the files in this directory, taken with a single scandir
+        # the first time it is needed in a run. Files written by this run are
+        # added to it.
+        self.files: typing.Set[str] = None
 
     def __repr__(self):
         return (
-            f"<OutputDir path={self.path} n_deck_files={len(self.deck_files)} "
-            f"id={self._id}>"
+            f"<OutputDir path={self.path} "
+            f"n_deck_files={len(self._deck_files)} id={self._id}>"
         )
 
+    @property
+    def deck_files(self):
+        if self.pending_outputs:
+            self.load_deck_files()
+        return self._deck_files
+
+    def loaded_deck_files(self):
+        """Return the DeckFiles in memory, without loading pending ones."""
+        return self._deck_files.values()
+
+    def defer_deck_files(self, output):
+        """Load the DeckFiles of output on the first access to deck_files."""
+        self.pending_outputs.append(output)
+
+    def load_deck_files(self):
+        outputs = {output.id: output for output in self.pending_outputs}
+        self.pending_outputs = []
+
+        for tup in database.execute(
+            "SELECT "
+            "df.output, d.id, d.deck_id, d.source, df.id, df.file_name, "
+            "df.updated FROM deck_files df JOIN decks d ON df.deck = d.id "
+            "WHERE df.output IN (" + ", ".join("?" * len(outputs)) + ");",
+            list(outputs),
+        ):
+            (
+                df_output,
+                d_db_id,
+                d_deck_id,
+                d_source,
+                df_db_id,
+                df_file_name,
+                df_updated,
+            ) = tup
+            output = outputs[df_output]
+            deck_file = DeckFile(
+                deckreprs.DeckDetails(d_deck_id, d_source, d_db_id),
+                df_updated,
+                df_file_name,
+                output,
+                df_db_id,
+            )
+            deck_file.mark_clean()
+            self.add_deck_file(output, deck_file)
+
     def ensure_exists(self):
         if os.path.isfile(self.path):
             raise FileExistsError(
@@ -54,6 +131,27 @@ class OutputDir(database.StoredObject):
         if not os.path.exists(self.path):
             os.makedirs(self.path)
 
+    def scan(self):
+        """Snapshot the files in this directory to avoid a stat per deck."""
+
+        self.files = set()
+        if not os.path.isdir(self.path):
+            return
+
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    self.files.add(entry.name)
+
+    def file_exists(self, file_name):
+        if self.files is None:
+            self.scan()
+        return file_name in self.files
+
+    def file_written(self, file_name):
+        if self.files is not None:
+            self.files.add(file_name)
+
     def key(self, output, deck):
         return hash((output, deck))
 
@@ -64,21 +162,38 @@ class OutputDir(database.StoredObject):
             deck.name
         )
 
-        i = 1
-        while any(d.file_name == file_name for d in self.deck_files.values()):
+        i = self.file_name_suffixes.get(suggested_file_name, 1)
+        while file_name in self.file_names:
             file_name = suggested_file_name.replace(".", f"_{i}.")
             i += 1
+        self.file_name_suffixes[suggested_file_name] = i
 
         return file_name
 
     def add_deck_file(self, output, deck_file):
-        self.deck_files[self.key(output, deck_file.deck)] = deck_file
+        key = self.key(output, deck_file.deck)
+        if key in self.deck_files:
+            self.forget_file_name(self.deck_files[key].file_name)
+        self.deck_files[key] = deck_file
+        self.file_names[deck_file.file_name] = (
+            self.file_names.get(deck_file.file_name, 0) + 1
+        )
+
+    def forget_file_name(self, file_name):
+        if self.file_names[file_name] > 1:
+            self.file_names[file_name] -= 1
+        else:
+            del self.file_names[file_name]
+
+            # The freed name may now be reused, so restart suffix allocation.
+            self.file_name_suffixes = {}
 
     def get_deck_file(self, output, deck):
         key = self.key(output, deck)
         if key not in self.deck_files:
-            self.deck_files[key] = DeckFile(
-                deck, 0, self.create_file_name(output, deck), output
+            self.add_deck_file(
+                output,
+                DeckFile(deck, 0, self.create_file_name(output, deck), output),
             )
         return self.deck_files[key]
 
@@ -96,7 +211,7 @@ class OutputDir(database.StoredObject):
         deck_file = self.get_deck_file(output, deck_update.deck)
 
         # Deck file was deleted
-        if not os.path.exists(os.path.join(self.path, deck_file.file_name)):
+        if not output.file_exists(deck_file.file_name):
             return True
 
         # Deck has been updated at source
@@ -106,20 +221,25 @@ class OutputDir(database.StoredObject):
         return False
 
     def store_deck_files(self):
-        for deck_file in self.deck_files.values():
+        # DeckFiles which haven't been loaded can't have been modified.
+        for deck_file in self.loaded_deck_files():
             deck_file.store()
 
     def remove_output(self, output):
         """Delete all DeckFiles associated with an Output."""
 
+        if output in self.pending_outputs:
+            self.pending_outputs.remove(output)
+
         to_delete = []
 
-        for k, v in self.deck_files.items():
+        for k, v in self._deck_files.items():
             if v.output is output:
                 to_delete.append(k)
 
         for k in to_delete:
-            del self.deck_files[k]
+            self.forget_file_name(self._deck_files[k].file_name)
+            del self._deck_files[k]
 
     @staticmethod
     def get_all():
@@ -158,8 +278,18 @@ class OutputDir(database.StoredObject):
 
 
 class Output(database.StoredObject):
+    include_maybe = database.TrackedColumn()
+    profile = database.TrackedColumn()
+    archive = database.TrackedColumn()
+
     def __init__(
-        self, target, output_dir, include_maybe=False, profile=None, db_id=None
+        self,
+        target,
+        output_dir,
+        include_maybe=False,
+        profile=None,
+        db_id=None,
+        archive=False,
     ):
         super().__init__("outputs", db_id)
         self.target: targets.target.Target = target
@@ -167,6 +297,12 @@ class Output(database.StoredObject):
         self.include_maybe: bool = include_maybe or False
         self.profile: Profile = profile  # Needed for FK in db
 
+        # If set, decks are saved as members of a single zip archive in
+        # output_dir, rather than as files. The member names in the archive
+        # are read the first time they are needed.
+        self.archive: bool = archive or False
+        self.archive_members: typing.Set[str] = None
+
     def __hash__(self):
         # Only needs to be unique to a given output_dir.
         # As an output dir can have at most one output for each target, the
@@ -176,9 +312,27 @@ class Output(database.StoredObject):
     def __repr__(self):
         return (
             f"<Output target={self.target.short} "
-            f"output_dir={repr(self.output_dir)} id={self._id}>"
+            f"output_dir={repr(self.output_dir)} archive={self.archive} "
+            f"id={self._id}>"
         )
 
+    @property
+    def archive_path(self):
+        return os.path.join(
+            self.output_dir.path,
+            utils.create_file_name(self.target.name) + ".zip",
+        )
+
+    def file_exists(self, file_name):
+        if not self.archive:
+            return self.output_dir.file_exists(file_name)
+
+        if self.archive_members is None:
+            self.archive_members = zip_archive.read_member_names(
+                self.archive_path
+            )
+        return file_name in self.archive_members
+
     def equivalent(self, other):
         return other and (
             other.target is self.target and other.output_dir is self.output_dir
@@ -194,27 +348,65 @@ class Output(database.StoredObject):
         return deck_file
 
     def save_deck(self, deck):
+        self.save_decks([deck])
+
+    def save_decks(self, decks):
+        if self.archive:
+            self.save_decks_to_archive(decks)
+        else:
+            write_deck_files(self.deck_file_writes(decks))
+
+    def save_decks_to_archive(self, decks):
+        """Add decks to the archive, rendered as they would be in files."""
+
+        writes = self.deck_file_writes(decks)
+        members = {
+            write.deck_file.file_name: self.target.render_deck(
+                write.deck, self.include_maybe, write.card_info_map
+            )
+            for write in writes
+        }
+        zip_archive.update(self.archive_path, members)
+
+        if self.archive_members is not None:
+            self.archive_members.update(members)
+        for write in writes:
+            write.deck_file.update()
+
+    def deck_file_writes(self, decks):
+        """Return a DeckFileWrite for each deck, to save decks to this output.
+
+        Card info and file names are resolved here, so that the writes
+        themselves don't use the database or modify any shared state.
+        """
+
         self.output_dir.ensure_exists()
 
+        card_info_map = card_info.map_from_decks(
+            decks, mtgo_id_required=self.target.mtgo_id_required
+        )
+        return [
+            DeckFileWrite(
+                self,
+                deck,
+                self.output_dir.get_deck_file(self, deck),
+                card_info_map,
+            )
+            for deck in decks
+        ]
+
+    def write_deck_file(self, deck, deck_file, card_info_map, batch):
         self.target.save_deck(
             deck,
-            os.path.join(
-                self.output_dir.path, self.get_updated_deck_file(deck).file_name
-            ),
+            os.path.join(self.output_dir.path, deck_file.file_name),
             self.include_maybe,
+            card_info_map,
+            batch,
         )
 
-    def save_decks(self, decks):
-        self.output_dir.ensure_exists()
-
-        deck_tuples = []
-        for deck in decks:
-            deck_file = self.get_updated_deck_file(deck)
-            deck_tuples.append(
-                (deck, os.path.join(self.output_dir.path, deck_file.file_name))
-            )
-
-        self.target.save_decks(deck_tuples, self.include_maybe)
+    def deck_file_written(self, deck_file):
+        deck_file.update()
+        self.output_dir.file_written(deck_file.file_name)
 
     def deck_needs_updating(self, deck_update):
         return self.output_dir.deck_needs_updating(self, deck_update)
@@ -239,6 +431,7 @@ class Output(database.StoredObject):
             "target": self.target.name,
             "output_dir": self.output_dir.path,
             "include_maybe": self.include_maybe,
+            "archive": self.archive,
         }
 
     @staticmethod
@@ -247,14 +440,84 @@ class Output(database.StoredObject):
             targets.get(data["target"], True),
             OutputDir.get(data["output_dir"]),
             data["include_maybe"],
+            archive=data.get("archive", False),
         )
 
 
+class DeckFileWrite(typing.NamedTuple):
+    output: Output
+    deck: deckreprs.Deck
+    deck_file: DeckFile
+    card_info_map: typing.Dict[str, deckreprs.Card]
+
+    def write(self, batch):
+        self.output.write_deck_file(
+            self.deck, self.deck_file, self.card_info_map, batch
+        )
+
+
+# Writing a deck file is mostly opening, writing and closing a small file,
+# which release the GIL, so with several cores or a slow file system threads
+# can overlap them. Small batches aren't worth starting threads for.
+WRITER_POOL_MAX_WORKERS = 8
+WRITER_POOL_MIN_WRITES = 16
+
+
+def try_write(write, batch):
+    """Perform a DeckFileWrite, returning the exception it raised, if any."""
+
+    try:
+        write.write(batch)
+    except Exception as e:
+        return e
+    return None
+
+
+def write_deck_files(writes):
+    """Perform each DeckFileWrite in writes, using a thread pool for large
+    batches.
+
+    Files are written atomically, as one batch, so they are only moved into
+    place once every write has finished. Each DeckFile is then marked updated
+    if its file was written, in the order of writes, so a failed write leaves
+    its DeckFile to be retried next time. The first exception raised by a
+    write is raised once all writes are done.
+    """
+
+    batch = atomic_writer.AtomicWriteBatch()
+    workers = min(WRITER_POOL_MAX_WORKERS, os.cpu_count() or 1)
+    if workers > 1 and len(writes) >= WRITER_POOL_MIN_WRITES:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers
+        ) as executor:
+            errors = list(
+                executor.map(try_write, writes, itertools.repeat(batch))
+            )
+    else:
+        errors = [try_write(write, batch) for write in writes]
+    batch.commit()
+
+    for write, error in zip(writes, errors):
+        if error is None:
+            write.output.deck_file_written(write.deck_file)
+        else:
+            logging.error(
+                f"Failed to write {write.deck_file.file_name} to "
+                f"{write.output.output_dir.path}: {error}"
+            )
+
+    for error in errors:
+        if error is not None:
+            raise error
+
+
 class User(database.StoredObject):
     # Keep a dict mapping (name, source) to User so that only one instance
     # exists for each user.
     users: typing.Dict[typing.Tuple[str, str], "User"] = {}
 
+    source_id = database.TrackedColumn()
+
     def __init__(self, name, source, source_id=None, db_id=None):
         super().__init__("users", db_id)
         self.name: str = name
@@ -306,9 +569,17 @@ class User(database.StoredObject):
         if not db_id:
             return None
 
-        name, short, source_id = database.select_one(
-            "users", ["name", "source", "source_id"], id=db_id
+        return User.from_record(
+            (db_id,)
+            + database.select_one(
+                "users", ["name", "source", "source_id"], id=db_id
+            )
         )
+
+    @staticmethod
+    def from_record(tup):
+        # database record format: (id, name, source, source_id)
+        db_id, name, short, source_id = tup
         user = User(name, short, source_id, db_id)
         User.users[(name, short)] = user
         return user
@@ -317,6 +588,8 @@ class User(database.StoredObject):
 class Profile(database.StoredObject):
     THREAD_POOL_MAX_WORKERS = 12
 
+    name = database.TrackedColumn()
+
     def __init__(self, user, name, outputs=None, db_id=None):
         super().__init__("profiles", db_id)
         self.source: sources.source.Source = sources.get(user.source)
@@ -367,37 +640,51 @@ class Profile(database.StoredObject):
         self.outputs = []
 
     def save_deck(self, deck):
-        for output in self.outputs:
-            output.save_deck(deck)
+        self.save_decks([deck])
 
     def save_decks(self, decks):
+        writes = []
         for output in self.outputs:
-            output.save_decks(decks)
+            if output.archive:
+                output.save_decks_to_archive(decks)
+            else:
+                writes.extend(output.deck_file_writes(decks))
+        write_deck_files(writes)
 
     def download_deck(self, deck_id):
         logging.debug(f"Downloading {self.source.name} deck {deck_id}.")
 
         return self.source.get_deck(deck_id)
 
-    # This is asynchronous so that it can use a ThreadPoolExecutor to speed up
-    # perfoming many deck requests.
-    async def download_decks_pool(self, deck_ids):
+    def download_and_resolve_deck(self, deck_id):
+        """Download a deck and look up its cards for each output's target.
+
+        Card lookups are cached, so resolving cards as each deck arrives means
+        that saving the decks afterwards doesn't need to wait on the database.
+        """
+
+        deck = self.download_deck(deck_id)
+        for mtgo_id_required in {
+            output.target.mtgo_id_required for output in self.outputs
+        }:
+            card_info.map_from_deck(deck, mtgo_id_required)
+        return deck
+
+    # Decks are downloaded in a thread pool to speed up performing many deck
+    # requests.
+    def download_decks_pool(self, deck_ids):
         logging.info(
             f"Downloading {len(deck_ids)} decks for {self.user_string}."
         )
 
-        loop = asyncio.get_event_loop()
         with concurrent.futures.ThreadPoolExecutor(
             max_workers=Profile.THREAD_POOL_MAX_WORKERS
         ) as executor:
-            futures = [
-                loop.run_in_executor(executor, self.download_deck, deck_id)
-                for deck_id in deck_ids
-            ]
-            decks = await asyncio.gather(*futures)
-
-        # Gather all decks and then save synchonously so that we can update the
-        # card database first if necessary.
+            decks = list(executor.map(self.download_and_resolve_deck, deck_ids))
+        database.close_finished_readers()
+
+        # Cards have been resolved by the workers, updating the card database
+        # if necessary, so the decks can now be saved in order.
         self.save_decks(decks)
 
     def download_all(self):
@@ -408,7 +695,7 @@ class Profile(database.StoredObject):
         for output in self.outputs:
             decks_to_update.update(output.decks_to_update(deck_list))
 
-        asyncio.run(self.download_decks_pool(decks_to_update))
+        self.download_decks_pool(decks_to_update)
         logging.info(f"Successfully updated all decks for {self.user_string}.")
 
     def download_latest(self):
@@ -485,23 +772,41 @@ class Cache:
     def build_profile(self, source, user, name=None):
         return self.add_profile(Profile(User.get(user, source), name, []))
 
-    def build_output(self, profile, target, path, include_maybe):
-        profile.add_output(Output(target, OutputDir.get(path), include_maybe))
+    def build_output(self, profile, target, path, include_maybe, archive=False):
+        profile.add_output(
+            Output(target, OutputDir.get(path), include_maybe, archive=archive)
+        )
 
     def get_all_output_dirs(self):
         return OutputDir.get_all()
 
+    def stored_objects(self):
+        """Yield every StoredObject in the cache, referenced objects first."""
+
+        output_dirs = {}
+        for profile in self.profiles:
+            yield profile.user
+            yield profile
+            for output in profile.outputs:
+                output_dirs[output.output_dir.path] = output.output_dir
+                yield output.output_dir
+                yield output
+
+        for output_dir in output_dirs.values():
+            yield from output_dir.loaded_deck_files()
+
     def save(self):
         logging.debug("Saving cache to database.")
 
         if not utils.DEBUG:
             database.disable_logging()
 
-        for profile in self.profiles:
-            profile.store()
+        # Only new and modified objects are written, so saving after a sync
+        # which changed nothing doesn't touch the database.
+        with database.transaction():
+            database.store_modified(self.stored_objects())
 
         database.enable_logging()
-        database.commit()
         logging.debug("Successfullly saved cache, closing connection.")
         database.close()
 
@@ -526,19 +831,11 @@ class Cache:
         """Load all relevant data into memory from the database."""
         database.init()
 
-        output_dirs = []
-        for tup in database.select_ignore_none("output_dirs", path=path):
-            db_id, path = tup
-            output_dirs.append(OutputDir(path, db_id))
-
-        profiles = []
-
-        query = (
-            "SELECT p.id, p.user, p.name "
-            "FROM profiles p LEFT JOIN users u ON p.user = u.id"
-        )
-        arguments = []
+        # The object graph is hydrated from two joined queries, for profiles
+        # and outputs, rather than querying outputs per profile. DeckFiles are
+        # loaded per OutputDir when first needed.
         conditions = []
+        arguments = []
         if user:
             conditions.append("UPPER(u.name) = UPPER(?)")
             arguments.append(user)
@@ -548,74 +845,68 @@ class Cache:
         if name:
             conditions.append("p.name = ?")
             arguments.append(name)
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        for tup in database.execute(query + ";", arguments):
-            profile_db_id, profile_user, profile_name = tup
-
-            outputs = []
-            for tup in database.select_ignore_none(
-                "outputs",
-                target=getattr(target, "short", None),
-                profile=profile_db_id,
-            ):
-                (
-                    output_db_id,
-                    output_target,
-                    output_dir_id,
-                    _,
-                    output_include_maybe,
-                ) = tup
-
-                for output_dir in output_dirs:
-                    if output_dir.id == output_dir_id:
-                        break
-                else:
-                    raise LookupError(
-                        f"Failed to find dir with id {output_dir_id}."
-                    )
-
-                output = Output(
-                    targets.get(output_target),
-                    output_dir,
-                    bool(output_include_maybe),
-                    db_id=output_db_id,
-                )
-                outputs.append(output)
-
-                for tup in database.execute(
-                    "SELECT "
-                    "d.id, d.deck_id, d.source, df.id, df.file_name, df.updated"
-                    " FROM deck_files df LEFT JOIN decks d ON df.deck = d.id "
-                    "WHERE df.output = ?;",
-                    (output.id,),
-                ):
-                    (
-                        d_db_id,
-                        d_deck_id,
-                        d_source,
-                        df_db_id,
-                        df_file_name,
-                        df_updated,
-                    ) = tup
-                    output.output_dir.add_deck_file(
-                        output,
-                        DeckFile(
-                            deckreprs.DeckDetails(d_deck_id, d_source, d_db_id),
-                            df_updated,
-                            df_file_name,
-                            output,
-                            df_db_id,
-                        ),
-                    )
-
-            profiles.append(
-                Profile(
-                    User.load(profile_user),
-                    profile_name,
-                    outputs,
-                    profile_db_id,
+
+        profiles = {}
+        for tup in database.execute(
+            "SELECT p.id, p.name, u.id, u.name, u.source, u.source_id "
+            "FROM profiles p JOIN users u ON p.user = u.id"
+            + where_clause(conditions)
+            + " ORDER BY p.id;",
+            arguments,
+        ):
+            profile_db_id, profile_name, *user_record = tup
+            profiles[profile_db_id] = Profile(
+                User.from_record(user_record), profile_name, [], profile_db_id
+            )
+
+        if target:
+            conditions.append("o.target = ?")
+            arguments.append(target.short)
+        if path:
+            conditions.append("od.path = ?")
+            arguments.append(path)
+
+        for tup in database.execute(
+            "SELECT o.id, o.target, o.profile, o.include_maybe, o.archive, "
+            "od.id, od.path "
+            "FROM outputs o JOIN output_dirs od ON o.output_dir = od.id "
+            "JOIN profiles p ON o.profile = p.id JOIN users u ON p.user = u.id"
+            + where_clause(conditions)
+            + " ORDER BY o.id;",
+            arguments,
+        ):
+            (
+                output_db_id,
+                output_target,
+                output_profile,
+                output_include_maybe,
+                output_archive,
+                output_dir_db_id,
+                output_dir_path,
+            ) = tup
+
+            if output_dir_path not in OutputDir.output_dirs:
+                OutputDir.output_dirs[output_dir_path] = OutputDir(
+                    output_dir_path, output_dir_db_id
                 )
+
+            output = Output(
+                targets.get(output_target),
+                OutputDir.output_dirs[output_dir_path],
+                bool(output_include_maybe),
+                db_id=output_db_id,
+                archive=bool(output_archive),
             )
+            profiles[output_profile].add_output(output)
+            output.output_dir.defer_deck_files(output)
+
+        cache = Cache(list(profiles.values()))
+        for stored_object in cache.stored_objects():
+            stored_object.mark_clean()
+        return cache
+
 
-        return Cache(profiles)
+def where_clause(conditions):
+    if conditions:
+        return " WHERE " + " AND ".join(conditions)
+    return ""
@@ -1,8 +1,12 @@
+import contextlib
 import dataclasses
 import enum
 import logging
 import os
+import re
 import sqlite3
+import threading
+import time
 import traceback
 import typing
 
@@ -10,33 +14,101 @@ from . import utils
 
 DATABASE_FILE = "architrice.db"
 
+# Key in string_values of the sources and targets registered in the database.
+REGISTRY_KEY = "registry"
 
-class Database:
-    USER_VERSION = 2
 
-    def __init__(self, tables=None):
+class Database:
+    USER_VERSION = 5
+
+    # PRAGMAs applied to each connection. WAL journaling with synchronous
+    # NORMAL only syncs at checkpoints rather than on every commit, and a
+    # larger page cache and memory map speed up reads of the card table.
+    # Incremental auto_vacuum takes effect for new databases, or after the
+    # next VACUUM of an existing one.
+    DEFAULT_PRAGMAS = {
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -16 * 1024,  # negative values are in KiB
+        "temp_store": "MEMORY",
+    }
+
+    # Values of PRAGMA auto_vacuum by name.
+    AUTO_VACUUM_MODES = {"NONE": 0, "FULL": 1, "INCREMENTAL": 2}
+
+    # Size of the sqlite3 prepared statement cache of each connection.
+    CACHED_STATEMENTS = 256
+
+    # SQLite versions before 3.32 limit statements to 999 variables.
+    MAX_VARIABLES = 999
+
+    def __init__(self, tables=None, pragmas=None):
         self.conn = None
+        self.write_cursor: sqlite3.Cursor = None
         self.file: str = None
-        self.tables_to_init = tables
-        self.tables = {}
+        self.pragmas: typing.Dict[str, typing.Any] = (
+            Database.DEFAULT_PRAGMAS if pragmas is None else pragmas
+        )
+        self.transaction_depth = 0
+
+        # The connection made by init is the only one used for writes, and is
+        # shared between threads under self.lock. Other threads read through
+        # their own connections, so that they aren't blocked by writes.
+        self.lock = threading.RLock()
+        self.writer_thread: int = None
+        # The thread in an open transaction reads through the writer
+        # connection too, so that it sees its own uncommitted writes.
+        self.transaction_thread: int = None
+        self.local = threading.local()
+        # (thread, connection) for each reader connection which is open.
+        self.readers: typing.List[
+            typing.Tuple[threading.Thread, sqlite3.Connection]
+        ] = []
+        self.generation = 0
+
+        # Tables are registered up front so that a Database can be initialised
+        # again, for example with a different file.
+        self.tables = {table.name: table for table in tables or []}
         self.log = True
 
+        # QueryStats, if profiling has been enabled.
+        self.stats: QueryStats = None
+
+    def pragma(self, name):
+        """Return the value of PRAGMA name."""
+        return list(self.execute(f"PRAGMA {name};"))[0][0]
+
     def init(self, database_file, initial_setup=False):
         """Connect to and set up the database for user."""
         self.file = database_file
-        self.conn = sqlite3.connect(self.file)
+        self.conn = sqlite3.connect(
+            self.file,
+            check_same_thread=False,
+            cached_statements=Database.CACHED_STATEMENTS,
+        )
+        self.write_cursor = self.conn.cursor()
+        self.writer_thread = threading.get_ident()
+        self.generation += 1
 
         logging.debug("Connected to database.")
 
+        for key, value in self.pragmas.items():
+            # Setting auto_vacuum writes to the database file even when the
+            # mode doesn't change, so it's only set if the mode differs.
+            if key == "auto_vacuum" and Database.AUTO_VACUUM_MODES.get(
+                str(value).upper(), value
+            ) == self.pragma(key):
+                continue
+            self.execute(f"PRAGMA {key} = {value};")
+
         if initial_setup:
             self.execute(f"PRAGMA user_version = {Database.USER_VERSION};")
         self.execute("PRAGMA foreign_keys = ON;")
 
-        if self.tables_to_init is not None:
-            for table in self.tables_to_init:
-                self.add_table(table, initial_setup)
-
-        self.tables_to_init = None
+        for table in list(self.tables.values()):
+            self.add_table(table, initial_setup)
 
         # execute returns a cursor, which becomes a list of tuples,
         # the first of which is (version,).
@@ -57,6 +129,39 @@ class Database:
             self.add_table(self.tables["string_values"], True)
             self.execute("PRAGMA user_version = 2;")
             version = 2
+        if version == 2:
+            logging.debug("Migrating database from version 2 to version 3.")
+            for table in self.tables.values():
+                table.create_indexes()
+            self.execute("PRAGMA user_version = 3;")
+            version = 3
+        if version == 3:
+            logging.debug("Migrating database from version 3 to version 4.")
+            for table in ["card_names", "editions", "printings"]:
+                self.add_table(self.tables[table], True)
+            self.execute(
+                "INSERT OR IGNORE INTO card_names (name, is_dfc) "
+                "SELECT name, MAX(is_dfc) FROM cards GROUP BY name;"
+            )
+            self.execute(
+                "INSERT OR IGNORE INTO editions (code) "
+                "SELECT DISTINCT edition FROM cards;"
+            )
+            self.execute(
+                "INSERT OR IGNORE INTO printings "
+                "(name, edition, collector_number, mtgo_id, reprint) "
+                "SELECT n.id, e.id, c.collector_number, c.mtgo_id, c.reprint "
+                "FROM cards c JOIN card_names n ON c.name = n.name "
+                "JOIN editions e ON c.edition = e.code;"
+            )
+            self.execute("DROP TABLE cards;")
+            self.execute("PRAGMA user_version = 4;")
+            version = 4
+        if version == 4:
+            logging.debug("Migrating database from version 4 to version 5.")
+            self.execute("ALTER TABLE outputs ADD COLUMN archive INTEGER")
+            self.execute("PRAGMA user_version = 5;")
+            version = 5
 
     def add_table(self, table, create=False):
         """Add a Table to the database, creating it if necessary."""
@@ -78,10 +183,7 @@ class Database:
 
     def insert_many_tuples(self, table, columns, tuples, conflict=None):
         """Execute many INSERT INTO INTO table (columns) VALUES(tuples)"""
-        self.execute_many(
-            self.tables[table].insert_command(columns, columns, conflict),
-            tuples,
-        )
+        self.tables[table].insert_many_tuples(columns, tuples, conflict)
 
     def upsert_many(self, table, **kwargs):
         """Execute many upserts into table."""
@@ -122,8 +224,33 @@ class Database:
 
         return self.select(table, columns, **kwargs)
 
-    def select_where_in(self, table, field, values, columns="*"):
-        """SELECT columns FROM table WHERE field in values"""
+    def select_where_in(self, table, field, values, columns="*", **kwargs):
+        """SELECT columns FROM table WHERE field in values
+
+        Each kwarg further restricts the rows to those whose column of that
+        name is in the kwarg's values, which should be few. Values of field
+        are queried in chunks to stay within SQLite's variable limit, so this
+        returns a list of tuples rather than a cursor.
+        """
+        if isinstance(columns, list):
+            columns = ", ".join(columns)
+
+        values = list(values)
+        other_values = {key: list(value) for key, value in kwargs.items()}
+        chunk_size = Database.MAX_VARIABLES - sum(
+            len(value) for value in other_values.values()
+        )
+        if chunk_size < 1:
+            raise ValueError("Too many values to select in one statement.")
+
+        results = []
+        for i in range(0, len(values), chunk_size):
+            results.extend(
+                self.tables[table].select_where_in(
+                    field, values[i : i + chunk_size], columns, other_values
+                )
+            )
+        return results
 
     def delete(self, table, **kwargs):
         """DELETE FROM table WHERE kwarg keys = kwarg values"""
@@ -133,6 +260,11 @@ class Database:
         """UPDATE table SET updates WHERE where"""
         self.tables[table].update(updates, where)
 
+    def update_many(self, table, columns, tuples):
+        """Execute many UPDATE table SET columns WHERE id, with tuples of
+        (*column_values, id)."""
+        self.tables[table].update_many(columns, tuples)
+
     def execute_ret(self, is_insert, cursor, result):
         if is_insert:
             if cursor.rowcount:
@@ -142,12 +274,92 @@ class Database:
         else:
             return result
 
+    def reader(self):
+        """Return the connection this thread should use for reads."""
+
+        thread = threading.get_ident()
+        if thread in (self.writer_thread, self.transaction_thread):
+            return self.conn
+
+        generation, conn = getattr(self.local, "reader", (None, None))
+        if generation != self.generation:
+            conn = sqlite3.connect(
+                self.file,
+                check_same_thread=False,
+                cached_statements=Database.CACHED_STATEMENTS,
+            )
+            for key, value in self.pragmas.items():
+                # Journal mode and auto_vacuum are properties of the database
+                # file, set by the writer.
+                if key not in ("journal_mode", "auto_vacuum"):
+                    conn.execute(f"PRAGMA {key} = {value};")
+
+            self.local.reader = (self.generation, conn)
+            with self.lock:
+                self.close_finished_readers()
+                self.readers.append((threading.current_thread(), conn))
+
+        return conn
+
+    def close_finished_readers(self):
+        """Close the reader connections of threads which have exited, such as
+        those of a thread pool which has been shut down."""
+
+        with self.lock:
+            readers = []
+            for thread, conn in self.readers:
+                if thread.is_alive():
+                    readers.append((thread, conn))
+                else:
+                    conn.close()
+            self.readers = readers
+
     def execute(self, command, tup=None):
-        """Execute an SQL command, logging the command and data."""
+        """Execute an SQL command, logging the command and data.
+
+        SELECTs from threads other than the one which called init use that
+        thread's own connection, unless the thread is in a transaction. Other
+        commands are serialised through the writer connection.
+        """
+
+        if command.startswith("SELECT"):
+            conn = self.reader()
+            if conn is not self.conn:
+                return self.execute_on(conn, command, tup)
+
+        with self.lock:
+            return self.execute_on(self.conn, command, tup)
+
+    def execute_on(self, conn, command, tup=None):
+        if self.stats is None:
+            return self.execute_command(conn, command, tup)
+
+        start = time.perf_counter()
+        result = self.execute_command(conn, command, tup)
+        if not isinstance(result, sqlite3.Cursor):
+            rows = self.write_cursor.rowcount
+        elif result.description is None:
+            rows = result.rowcount
+        else:
+            # Rows are only fetched as the cursor is iterated, so fetch them
+            # here to include them in the time.
+            result = result.fetchall()
+            rows = len(result)
+        self.stats.record(command, time.perf_counter() - start, rows)
+
+        return result
 
-        cursor = self.conn.cursor()
+    def execute_command(self, conn, command, tup=None):
         is_insert = command.startswith("INSERT")
 
+        # Writes don't return rows, so they can share a cursor. Other commands
+        # get their own, as the caller may still be iterating over a previous
+        # result.
+        if is_insert or command.startswith(("UPDATE", "DELETE")):
+            cursor = self.write_cursor
+        else:
+            cursor = conn.cursor()
+
         if tup:
             try:
                 if self.log:
@@ -183,15 +395,71 @@ class Database:
         """Execute many SQL commands."""
         if self.log:
             logging.debug(f"Executing many with command: {command}")
-        return self.conn.executemany(command, tups)
+        with self.lock:
+            if self.stats is None:
+                return self.conn.executemany(command, tups)
+
+            start = time.perf_counter()
+            result = self.conn.executemany(command, tups)
+            self.stats.record(
+                command, time.perf_counter() - start, result.rowcount
+            )
+            return result
+
+    def execute_script(self, script):
+        """Commit, then execute each statement of script to completion."""
+        if self.log:
+            logging.debug(f"Executing database script: {script}")
+        with self.lock:
+            return self.conn.executescript(script)
 
     def commit(self):
         """Commit database changes."""
-        self.conn.commit()
+        with self.lock:
+            self.conn.commit()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Run the enclosed commands in a single transaction.
+
+        Commits when the outermost transaction exits and rolls back if it
+        raises. Any uncommitted changes made before entering are included.
+        """
+
+        # Holding the writer lock for the duration keeps other threads' writes
+        # out of the transaction.
+        with self.lock:
+            if self.transaction_depth:
+                self.transaction_depth += 1
+                try:
+                    yield
+                finally:
+                    self.transaction_depth -= 1
+                return
+
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN;")
+
+            self.transaction_depth = 1
+            self.transaction_thread = threading.get_ident()
+            try:
+                yield
+            except BaseException:
+                self.conn.rollback()
+                raise
+            else:
+                self.conn.commit()
+            finally:
+                self.transaction_depth = 0
+                self.transaction_thread = None
 
     def close(self):
-        """Close the database connection."""
-        self.conn.close()
+        """Close the database connection and any reader connections."""
+        with self.lock:
+            for _, conn in self.readers:
+                conn.close()
+            self.readers = []
+            self.conn.close()
 
     def enable_logging(self):
         """Enable command logging."""
@@ -201,6 +469,81 @@ class Database:
         """Disable command logging."""
         self.log = False
 
+    def enable_profiling(self, slow_threshold=None):
+        """Record statistics for each statement shape executed.
+
+        If slow_threshold is set, statements taking at least that many seconds
+        are logged as they complete.
+        """
+        self.stats = QueryStats(slow_threshold)
+
+    def log_query_stats(self):
+        """Log a summary of recorded statement statistics."""
+        if self.stats is not None:
+            self.stats.log_summary()
+
+
+@dataclasses.dataclass
+class StatementStats:
+    count: int = 0
+    total: float = 0.0  # seconds
+    max: float = 0.0  # seconds
+    rows: int = 0  # rows returned, or changed by writes
+
+
+class QueryStats:
+    """Counts, latencies and row counts of executed statements.
+
+    Statements are grouped by shape: whitespace is collapsed and lists of
+    placeholders, as in "IN (?, ?, ?)", are treated as one.
+    """
+
+    PLACEHOLDER_LIST = re.compile(r"\(\?(?:, \?)*\)")
+
+    def __init__(self, slow_threshold=None):
+        self.slow_threshold: float = slow_threshold
+        self.statements: typing.Dict[str, StatementStats] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def shape(command):
+        return QueryStats.PLACEHOLDER_LIST.sub(
+            "(?, ...)", " ".join(command.split())
+        )
+
+    def record(self, command, elapsed, rows):
+        shape = QueryStats.shape(command)
+        with self.lock:
+            if shape not in self.statements:
+                self.statements[shape] = StatementStats()
+            stats = self.statements[shape]
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.rows += max(rows, 0)
+
+        if self.slow_threshold is not None and elapsed >= self.slow_threshold:
+            logging.warning(
+                f"Slow database command ({elapsed * 1000:.1f}ms): {command}"
+            )
+
+    def log_summary(self, limit=20):
+        statements = sorted(
+            self.statements.items(), key=lambda item: -item[1].total
+        )
+        logging.info(
+            f"Database statistics for {len(statements)} statement shapes, "
+            f"{sum(stats.total for _, stats in statements):.3f}s total:"
+        )
+        logging.info(
+            f"{'count':>8} {'total ms':>10} {'max ms':>8} {'rows':>8} statement"
+        )
+        for shape, stats in statements[:limit]:
+            logging.info(
+                f"{stats.count:>8} {stats.total * 1000:>10.1f} "
+                f"{stats.max * 1000:>8.1f} {stats.rows:>8} {shape}"
+            )
+
 
 @dataclasses.dataclass
 class Column:
@@ -229,12 +572,25 @@ class Column:
         return Column(name, datatype, references=name + "s", not_null=True)
 
 class Table:
-    def __init__(self, name, columns, constraints=None, db=None):
+    def __init__(
+        self, name, columns, constraints=None, db=None, without_rowid=False
+    ):
         self.name: str = name
         self.columns: typing.List[Column] = columns
         self.constraints: typing.List[str] = constraints or []
+        # Store rows in the primary key's b-tree rather than with a rowid.
+        self.without_rowid: bool = without_rowid
         self.set_db(db)
 
+        # Generated SQL, keyed by the shape of the command (kind of command,
+        # columns, conflict handling), so that each shape is only built once.
+        self.sql_cache: typing.Dict[tuple, typing.Any] = {}
+
+    def cached_sql(self, key, build, *args):
+        if key not in self.sql_cache:
+            self.sql_cache[key] = build(*args)
+        return self.sql_cache[key]
+
     def set_db(self, db, create=True):
         self.db = db
         if db and create:
@@ -249,9 +605,11 @@ class Table:
         self.db.execute(
             f"CREATE TABLE IF NOT EXISTS {self.name} ("
             + ", ".join(str(c) for c in self.columns + self.constraints)
-            + ");"
+            + (") WITHOUT ROWID;" if self.without_rowid else ");")
         )
+        self.create_indexes()
 
+    def create_indexes(self):
         for c in self.columns:
             if c.index_on:
                 self.db.execute(
@@ -293,7 +651,7 @@ class Table:
             arguments.append(arguments[column_names.index(c)])
         return update_columns
 
-    def create_upsert_string(self, column_names, arguments):
+    def conflict_columns(self, column_names):
         # Note:
         # sqlite only supports a single on conflict term, so this prioritises
         # first multi-column unique statements, then unique columns and finally
@@ -307,31 +665,54 @@ class Table:
 
                 # Only handle conflicts in columns which could actually occur
                 if any(c in column_names for c in conflict_columns):
-                    return self.on_conflict_update_string(
-                        conflict_columns,
-                        self.update_columns(
-                            conflict_columns, column_names, arguments
-                        ),
-                    )
+                    return conflict_columns
 
         for c in self.columns:
             if c.unique and c.name in column_names:
-                return self.on_conflict_update_string(
-                    [c.name],
-                    self.update_columns([c.name], column_names, arguments),
-                )
+                return [c.name]
 
         for c in self.columns:
             if c.primary_key and c.name in column_names:
-                return self.on_conflict_update_string(
-                    [c.name],
-                    self.update_columns([c.name], column_names, arguments),
-                )
+                return [c.name]
+
+        return None
 
-        return ""
+    def create_upsert_string(self, column_names, arguments):
+        conflict_columns = self.conflict_columns(column_names)
+        if conflict_columns is None:
+            return ""
+
+        return self.on_conflict_update_string(
+            conflict_columns,
+            self.update_columns(conflict_columns, column_names, arguments),
+        )
 
     def insert_command(self, column_names, arguments, conflict=None):
-        substitution_string = self.substitution_string(arguments)
+        # Note: like create_upsert_string, this mutates the argument list to
+        # add the arguments needed for an upsert.
+
+        command, update_indices = self.cached_sql(
+            ("insert", tuple(column_names), conflict),
+            self.create_insert_command,
+            column_names,
+            conflict,
+        )
+        for i in update_indices:
+            arguments.append(arguments[i])
+        return command
+
+    def create_insert_command(self, column_names, conflict):
+        """Return (command, update_indices), where update_indices are the
+        indices of the arguments to append for the upsert clause."""
+
+        # Placeholder arguments are used to record which arguments
+        # create_upsert_string appends.
+        arguments = list(range(len(column_names)))
+        command = self.build_insert_command(column_names, arguments, conflict)
+        return command, arguments[len(column_names) :]
+
+    def build_insert_command(self, column_names, arguments, conflict=None):
+        substitution_string = self.substitution_string(column_names)
 
         if conflict == "update":
             upsert_string = self.create_upsert_string(column_names, arguments)
@@ -364,6 +745,20 @@ class Table:
             arguments,
         )
 
+    def insert_many_tuples(self, column_names, tuples, conflict=None):
+        command, update_indices = self.cached_sql(
+            ("insert", tuple(column_names), conflict),
+            self.create_insert_command,
+            column_names,
+            conflict,
+        )
+        if update_indices:
+            tuples = (
+                tuple(tup) + tuple(tup[i] for i in update_indices)
+                for tup in tuples
+            )
+        self.db.execute_many(command, tuples)
+
     def insert_many(self, **kwargs):
         column_names, arguments = self.create_insert_args(**kwargs)
         self.db.execute_many(
@@ -384,7 +779,24 @@ class Table:
         return f"{name} = ?"
 
     def create_where_string(self, column_names, arguments):
-        where_string = (
+        null_checks = tuple(
+            arg if self.is_null_check(arg) else None for arg in arguments
+        )
+        where_string = self.cached_sql(
+            ("where", tuple(column_names), null_checks),
+            self.build_where_string,
+            column_names,
+            arguments,
+        )
+        arguments = [
+            arg
+            for arg, null_check in zip(arguments, null_checks)
+            if not null_check
+        ]
+        return where_string, arguments
+
+    def build_where_string(self, column_names, arguments):
+        return (
             (
                 " WHERE "
                 + " AND ".join(
@@ -397,8 +809,6 @@ class Table:
             if column_names
             else ""
         )
-        arguments = [arg for arg in arguments if not self.is_null_check(arg)]
-        return where_string, arguments
 
     def common_where_handling(self, **kwargs):
         return self.create_where_string(*self.create_insert_args(**kwargs))
@@ -406,16 +816,44 @@ class Table:
     def select(self, column_string, **kwargs):
         where_string, arguments = self.common_where_handling(**kwargs)
         return self.db.execute(
-            f"SELECT {column_string} FROM {self.name}{where_string};",
+            self.cached_sql(
+                ("select", column_string, where_string),
+                "SELECT {} FROM {}{};".format,
+                column_string,
+                self.name,
+                where_string,
+            ),
             arguments,
         )
 
-    def select_where_in(self, field, values, column_string):
+    def select_where_in(self, field, values, column_string, other_values):
         return self.db.execute(
-            f"SELECT {column_string} FROM {self.name} WHERE {field} IN ("
-            + ("?, " * len(values))[:-2]
-            + ");",
-            values,
+            self.cached_sql(
+                (
+                    "where_in",
+                    field,
+                    len(values),
+                    column_string,
+                    tuple((k, len(v)) for k, v in other_values.items()),
+                ),
+                self.build_select_where_in,
+                field,
+                values,
+                column_string,
+                other_values,
+            ),
+            values + [v for value in other_values.values() for v in value],
+        )
+
+    def build_select_where_in(self, field, values, column_string, other_values):
+        return (
+            f"SELECT {column_string} FROM {self.name} WHERE {field} IN "
+            + self.substitution_string(values)
+            + "".join(
+                f" AND {key} IN {self.substitution_string(value)}"
+                for key, value in other_values.items()
+            )
+            + ";"
         )
 
     def delete(self, **kwargs):
@@ -428,39 +866,88 @@ class Table:
     def update(self, updates, where):
         where_string, arguments = self.common_where_handling(**where)
 
-        update_args = []
-        update_strings = []
-        for k, v in updates.items():
-            update_strings.append(f"{k} = ?")
-            update_args.append(v)
-        
-        arguments = update_args + arguments
+        arguments = list(updates.values()) + arguments
 
         self.db.execute(
+            self.cached_sql(
+                ("update", tuple(updates), where_string),
+                self.build_update_command,
+                updates,
+                where_string,
+            ),
+            arguments,
+        )
+
+    def build_update_command(self, columns, where_string):
+        return (
             f"UPDATE {self.name} SET "
-            + ", ".join(update_strings)
+            + ", ".join(f"{c} = ?" for c in columns)
             + where_string
-            + ";",
-            arguments
+            + ";"
+        )
+
+    def update_many(self, columns, tuples):
+        self.db.execute_many(
+            self.cached_sql(
+                ("update", tuple(columns), " WHERE id = ?"),
+                self.build_update_command,
+                columns,
+                " WHERE id = ?",
+            ),
+            tuples,
         )
 
 class KeyStoredObject:
     # Singletons like Sources or Targets which are referred in the database
     # by keys.
 
+    __slots__ = ("key",)
+
     def __init__(self, key):
         self.key: str = key
 
 
+class TrackedColumn:
+    # Descriptor for StoredObject attributes which may be modified after the
+    # object is created. Setting the attribute marks the object dirty so that
+    # it is written back on the next store_modified.
+
+    def __set_name__(self, owner, name):
+        self.attribute = "_" + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return getattr(instance, self.attribute)
+
+    def __set__(self, instance, value):
+        setattr(instance, self.attribute, value)
+        instance.dirty = True
+
+
 class StoredObject:
     # Objects which are stored in the database may subclass from this class.
     # If they do, they should have attributes for each of the relevant fields
     # in the database. id is provided by default and so only tables with an
     # id column are applicable.
+    #
+    # Objects are considered dirty, differing from the database, until they
+    # are stored or marked clean by whatever loaded them. Columns which can
+    # change afterwards should be declared as TrackedColumns so that changing
+    # them marks the object dirty again.
+    #
+    # Subclasses with many instances should declare __slots__, including a
+    # slot named "_" + name for each TrackedColumn.
+
+    __slots__ = ("table", "_id", "dirty")
 
     def __init__(self, table, db_id=None):
         self.table: str = table
         self._id: int = db_id
+        self.dirty: bool = True
+
+    def mark_clean(self):
+        self.dirty = False
 
     @property
     def id(self):
@@ -512,12 +999,127 @@ class StoredObject:
                     },
                 )
 
+        self.mark_clean()
+
     def delete_stored(self):
         """If this object has been stored in the db, delete the record."""
         if self._id:
             delete(self.table, id=self._id)
 
 
+def store_many(stored_objects):
+    """Store many StoredObjects of a single table, setting their ids.
+
+    Objects are upserted with a single executemany and their ids looked up in
+    bulk by the table's unique key, rather than with an upsert and a SELECT
+    per object. Referenced objects without ids are stored first in the same
+    way.
+    """
+
+    stored_objects = [o for o in stored_objects if not o._id]
+    if not stored_objects:
+        return
+
+    table = database.tables[stored_objects[0].table]
+    columns = [c.name for c in table.columns if c.name != "id"]
+
+    referenced = {}
+    for stored_object in stored_objects:
+        for column in columns:
+            value = getattr(stored_object, column, None)
+            if isinstance(value, StoredObject) and not value._id:
+                referenced.setdefault(value.table, []).append(value)
+    for references in referenced.values():
+        store_many(references)
+
+    key_columns = table.conflict_columns(columns)
+    if key_columns is None:
+        for stored_object in stored_objects:
+            stored_object.store()
+        return
+    key_indices = [columns.index(c) for c in key_columns]
+
+    batch = []
+    rows = []
+    for stored_object in stored_objects:
+        row = tuple(stored_object.get_value(c) for c in columns)
+        if any(row[i] is None for i in key_indices):
+            # NULL never conflicts or matches, so store these individually.
+            stored_object.store()
+        else:
+            batch.append(stored_object)
+            rows.append(row)
+
+    if not batch:
+        return
+
+    table.insert_many_tuples(columns, rows, "update")
+
+    # The rows are selected by every column of their key. Only the first
+    # column may have many values, so the rest are only used to narrow the
+    # selection when they have few.
+    other_values = {
+        column: {row[i] for row in rows}
+        for column, i in zip(key_columns[1:], key_indices[1:])
+    }
+    if sum(map(len, other_values.values())) > Database.MAX_VARIABLES // 2:
+        other_values = {}
+
+    ids = {}
+    for tup in select_where_in(
+        table.name,
+        key_columns[0],
+        {row[key_indices[0]] for row in rows},
+        ["id"] + key_columns,
+        **other_values,
+    ):
+        db_id, *key = tup
+        ids[tuple(key)] = db_id
+
+    for stored_object, row in zip(batch, rows):
+        key = tuple(row[i] for i in key_indices)
+        if key in ids:
+            stored_object._id = ids[key]
+        else:
+            # Values may come back with a different type after conversion to
+            # the column's affinity, so look these up by their original key.
+            stored_object._id = select_one_column(
+                table.name, "id", **dict(zip(key_columns, key))
+            )
+        stored_object.mark_clean()
+
+
+def store_modified(stored_objects):
+    """Store new StoredObjects and batch the UPDATEs of dirty ones by table."""
+
+    to_insert = {}
+    to_update = {}
+    for stored_object in stored_objects:
+        if not stored_object._id:
+            to_insert.setdefault(stored_object.table, []).append(stored_object)
+        elif stored_object.dirty:
+            to_update.setdefault(stored_object.table, []).append(stored_object)
+
+    for stored_objects in to_insert.values():
+        store_many(stored_objects)
+
+    for table, stored_objects in to_update.items():
+        columns = [c.name for c in database.tables[table].columns]
+        columns.remove("id")
+
+        database.update_many(
+            table,
+            columns,
+            [
+                tuple(o.get_value(c) for c in columns) + (o._id,)
+                for o in stored_objects
+            ],
+        )
+
+        for stored_object in stored_objects:
+            stored_object.mark_clean()
+
+
 class DatabaseEvents(enum.Enum):
     CARD_LIST_UPDATE = 1
 
@@ -565,11 +1167,17 @@ database = Database(
                     "INTEGER",
                     references="output_dirs",
                     not_null=True,
+                    index_on=True,
                 ),
                 Column(
-                    "profile", "INTEGER", references="profiles", not_null=True
+                    "profile",
+                    "INTEGER",
+                    references="profiles",
+                    not_null=True,
+                    index_on=True,
                 ),
-                Column("include_maybe", "INTEGER")
+                Column("include_maybe", "INTEGER"),
+                Column("archive", "INTEGER"),
             ],
             ["UNIQUE(target, output_dir, profile)"],
         ),
@@ -582,16 +1190,37 @@ database = Database(
             ],
         ),
         Table(
-            "cards",
+            "card_names",
             [
                 Column("id", "INTEGER", primary_key=True),
-                Column("name", "TEXT", index_on=True),
-                Column("mtgo_id", "INTEGER", unique=True),
+                Column("name", "TEXT", not_null=True, unique=True),
                 Column("is_dfc", "INTEGER", not_null=True),
+            ],
+        ),
+        Table(
+            "editions",
+            [
+                Column("id", "INTEGER", primary_key=True),
+                Column("code", "TEXT", not_null=True, unique=True),
+            ],
+        ),
+        Table(
+            # Printings are keyed by name first so that the printings of a
+            # card are adjacent, and are found by a range of the primary key.
+            "printings",
+            [
+                Column(
+                    "name", "INTEGER", references="card_names", not_null=True
+                ),
+                Column(
+                    "edition", "INTEGER", references="editions", not_null=True
+                ),
                 Column("collector_number", "TEXT", not_null=True),
-                Column("edition", "TEXT", not_null=True),
+                Column("mtgo_id", "INTEGER"),
                 Column("reprint", "INTEGER", not_null=True),
             ],
+            ["PRIMARY KEY(name, edition, collector_number)"],
+            without_rowid=True,
         ),
         Table(
             "decks",
@@ -606,13 +1235,20 @@ database = Database(
             "deck_files",
             [
                 Column("id", "INTEGER", primary_key=True),
-                Column("deck", "INTEGER", references="decks", not_null=True),
+                Column(
+                    "deck",
+                    "INTEGER",
+                    references="decks",
+                    not_null=True,
+                    index_on=True,
+                ),
                 Column("file_name", "TEXT", not_null=True),
                 Column(
                     "output",
                     "INTEGER",
                     references="outputs",
                     not_null=True,
+                    index_on=True,
                 ),
                 Column("updated", "INTEGER"),
             ],
@@ -645,37 +1281,63 @@ select = database.select
 select_one = database.select_one
 select_one_column = database.select_one_column
 select_ignore_none = database.select_ignore_none
+select_where_in = database.select_where_in
 delete = database.delete
 update = database.update
+update_many = database.update_many
 execute = database.execute
+execute_script = database.execute_script
+pragma = database.pragma
 commit = database.commit
+transaction = database.transaction
 close = database.close
 enable_logging = database.enable_logging
 disable_logging = database.disable_logging
+enable_profiling = database.enable_profiling
+log_query_stats = database.log_query_stats
+close_finished_readers = database.close_finished_readers
+
+
+def init(pragmas=None):
+    """Connect to the database, setting it up if necessary.
 
+    pragmas optionally replaces Database.DEFAULT_PRAGMAS as the connection
+    settings, e.g. {} for SQLite's defaults.
+    """
 
-def init():
-    """Connect to the database, setting it up if necessary."""
+    if pragmas is not None:
+        database.pragmas = pragmas
 
     database_file = os.path.join(utils.DATA_DIR, DATABASE_FILE)
     initial_setup = not os.path.exists(database_file)
     utils.ensure_data_dir()
     database.init(database_file, initial_setup)
 
-    disable_logging()
     from . import sources
+    from . import targets
 
+    # Sources and targets are only registered when the list of them has
+    # changed since the last run, so that runs which don't change anything
+    # don't write to the database.
+    registry = ",".join(
+        f"{cls.SHORT}:{cls.NAME}"
+        for cls in sources.sourcelist + targets.targetlist
+    )
+    registered = select_one_column("string_values", "value", key=REGISTRY_KEY)
+    if registered == registry:
+        return
+
+    disable_logging()
     for source in sources.sourcelist:
         insert(
             "sources", conflict="ignore", short=source.SHORT, name=source.NAME
         )
 
-    from . import targets
-
     for target in targets.targetlist:
         insert(
             "targets", conflict="ignore", short=target.SHORT, name=target.NAME
         )
+    upsert("string_values", key=REGISTRY_KEY, value=registry)
     enable_logging()
 
     commit()
@@ -1,10 +1,25 @@
+import sys
+
 from . import database
 from . import utils
 
+# Cards are (quantity, name) tuples. As most cards appear in many decks, and
+# usually with the same quantity, each distinct card tuple is kept once and
+# shared by every deck which holds it, along with its interned name.
+_cards = {}
+
+
+def intern_card(card):
+    quantity, name = card
+    card = (quantity, sys.intern(name))
+    return _cards.setdefault(card, card)
+
 
 class DeckDetails(database.StoredObject):
     """A DeckDetails object represents a deck in a source."""
 
+    __slots__ = ("deck_id", "source")
+
     def __init__(self, deck_id, source, db_id=None):
         super().__init__("decks", db_id)
         self.deck_id: str = deck_id
@@ -23,16 +38,33 @@ class DeckDetails(database.StoredObject):
 class Deck(DeckDetails):
     """A Deck object represents a deck downloaded from a source."""
 
+    __slots__ = (
+        "name",
+        "description",
+        "main",
+        "side",
+        "maybe",
+        "commanders",
+        "_views",
+    )
+
     # The cards held by the deck are (quantity, name) tuples rather than Card
-    # objects. They are parsed into Cards before saving.
+    # objects. They are parsed into Cards before saving. Cards should be added
+    # with add_card or add_cards, so that they are shared with other decks and
+    # so that the cached views of the deck are cleared.
     def __init__(self, deck_id, source, name, description, **kwargs):
         super().__init__(deck_id, source, db_id=kwargs.get("id"))
         self.name: str = name
         self.description: str = description
-        self.main = kwargs.get("main", [])
-        self.side = kwargs.get("side", [])
-        self.maybe = kwargs.get("maybe", [])
-        self.commanders = kwargs.get("commanders", [])
+        self.main = list(map(intern_card, kwargs.get("main", [])))
+        self.side = list(map(intern_card, kwargs.get("side", [])))
+        self.maybe = list(map(intern_card, kwargs.get("maybe", [])))
+        self.commanders = list(map(intern_card, kwargs.get("commanders", [])))
+
+        # Sorted tuples of cards and the set of card names, keyed by the
+        # boards they include. Each target reads the same views of a deck, so
+        # they're computed once, on first use.
+        self._views = {}
 
     def __repr__(self):
         return super().__repr__().replace("<DeckDetails", "<Deck")
@@ -45,27 +77,37 @@ class Deck(DeckDetails):
         return [c[1] for c in self.get_board(board)]
 
     def get_all_card_names(self):
-        return set(
-            self.get_card_names("main")
-            + self.get_card_names("side")
-            + self.get_card_names("maybe")
-            + self.get_card_names("commanders")
-        )
+        names = self._views.get("names")
+        if names is None:
+            names = self._views["names"] = frozenset(
+                c[1]
+                for board in [self.main, self.side, self.maybe, self.commanders]
+                for c in board
+            )
+        return names
+
+    def get_view(self, *boards):
+        view = self._views.get(boards)
+        if view is None:
+            view = self._views[boards] = tuple(
+                self.sort_cards(
+                    c for board in boards for c in self.get_board(board)
+                )
+            )
+        return view
 
     def get_main_deck(self, include_commanders=False):
-        main_deck = self.main
         if include_commanders:
-            main_deck += self.commanders
-
-        return self.sort_cards(main_deck)
+            return self.get_view("main", "commanders")
+        return self.get_view("main")
 
     def get_sideboard(self, include_commanders=True, include_maybe=True):
-        sideboard = self.side[:]
+        boards = ["side"]
         if include_commanders:
-            sideboard += self.commanders
+            boards.append("commanders")
         if include_maybe:
-            sideboard += self.maybe
-        return self.sort_cards(sideboard)
+            boards.append("maybe")
+        return self.get_view(*boards)
 
     def get_board(self, board, default="main"):
         # Note: this is to be used to add cards, not to retrieve them, as it
@@ -84,15 +126,19 @@ class Deck(DeckDetails):
             return self.get_board(default)
 
     def add_card(self, card, board):
-        self.get_board(board).append(card)
+        self.get_board(board).append(intern_card(card))
+        self._views.clear()
 
     def add_cards(self, cards, board):
-        self.get_board(board).extend(cards)
+        self.get_board(board).extend(map(intern_card, cards))
+        self._views.clear()
 
 
 class DeckUpdate:
     """A DeckUpdate represents the last time a Deck was updated on a source."""
 
+    __slots__ = ("deck", "updated")
+
     # Because these are not stored anywhere, they don't need a db id.
     def __init__(self, deck, updated):
         self.deck: DeckDetails = deck
@@ -106,6 +152,8 @@ class DeckUpdate:
 
 
 class Card(database.StoredObject):
+    __slots__ = ("name", "mtgo_id", "is_dfc", "collector_number", "edition")
+
     def __init__(
         self,
         name,
@@ -115,7 +163,7 @@ class Card(database.StoredObject):
         edition=None,
         db_id=None,
     ):
-        super().__init__("cards", db_id)
+        super().__init__("printings", db_id)
         self.name: str = name
         self.mtgo_id: str = mtgo_id
         self.is_dfc: bool = is_dfc
@@ -131,9 +179,9 @@ class Card(database.StoredObject):
 
     @staticmethod
     def from_record(tup):
-        # database record format:
-        # (id, name, mtgo_id, is_dfc, collector_number, set, is_reprint)
-        _, name, mtgo_id, is_dfc, collector_number, edition, _ = tup
+        # record format, as selected by card_info.find:
+        # (name, mtgo_id, is_dfc, collector_number, set, is_reprint)
+        name, mtgo_id, is_dfc, collector_number, edition, _ = tup
         return Card(
             name, mtgo_id and str(mtgo_id), is_dfc, collector_number, edition
         )
@@ -3,6 +3,7 @@
 import argparse
 import logging
 
+from . import database
 from . import modes
 from . import sources
 from . import targets
@@ -60,6 +61,13 @@ def add_data_args(parser):
         nargs="?",
         const=1,
     )
+    parser.add_argument(
+        "-z",
+        "--archive",
+        dest="archive",
+        action="store_true",
+        help="save decks to a zip archive in the output directory",
+    )
     # Any string is admissable for a profile name.
     parser.add_argument("-n", "--name", dest="name", help="set profile name")
     # various flags
@@ -77,6 +85,19 @@ def add_data_args(parser):
         action="store_false",
         help="disable interactivity (for scripts)",
     )
+    parser.add_argument(
+        "--db-stats",
+        dest="db_stats",
+        action="store_true",
+        help="log statistics of database commands on exit",
+    )
+    parser.add_argument(
+        "--slow-query",
+        dest="slow_query",
+        type=float,
+        metavar="MS",
+        help="log database commands taking at least MS milliseconds",
+    )
 
 
 def process_args(args):
@@ -124,8 +145,16 @@ def main():
     if selected_mode is None:
         selected_mode = modes.Sync()
 
+    if args.db_stats or args.slow_query is not None:
+        database.enable_profiling(
+            None if args.slow_query is None else args.slow_query / 1000
+        )
+
     selected_mode.main(args)
 
+    if args.db_stats:
+        database.log_query_stats()
+
 
 if __name__ == "__main__":
     main()
@@ -8,6 +8,9 @@ from .output import AddOutput
 from .relnk import Relnk
 from .version import Version
 from .clear_cards import ClearCards
+from .maintain import Maintain
+from .export_cards import ExportCards
+from .import_cards import ImportCards
 
 from .sync import Sync  # Export
 
@@ -22,4 +25,7 @@ flag_modes = [
     Relnk(),
     Version(),
     ClearCards(),
+    Maintain(),
+    ExportCards(),
+    ImportCards(),
 ]
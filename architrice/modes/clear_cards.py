@@ -1,6 +1,7 @@
 import logging
 
 from .. import database
+from ..targets import card_info
 
 from . import mode
 
@@ -10,5 +11,8 @@ class ClearCards(mode.Mode):
         super().__init__("c", "clear-cards", "clear card info cache", [])
 
     def action(self, cache, args):
-        database.execute("DELETE FROM cards;")
+        with database.transaction():
+            for table in ["printings", "card_names", "editions"]:
+                database.execute(f"DELETE FROM {table};")
+        card_info.remove_snapshot()
         logging.info("Successfully cleared card data.")
@@ -130,7 +130,13 @@ def get_output_path(cache, interactive, target, path):
 
 
 def add_output(
-    cache, interactive, profile, target=None, path=None, include_maybe=None
+    cache,
+    interactive,
+    profile,
+    target=None,
+    path=None,
+    include_maybe=None,
+    archive=False,
 ):
     if profile is None:
         profile = get_profile(
@@ -155,4 +161,4 @@ def add_output(
             "Include maybeboards in the decks downloaded?"
         )
 
-    cache.build_output(profile, target, path, include_maybe)
+    cache.build_output(profile, target, path, include_maybe, archive)
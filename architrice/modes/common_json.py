@@ -42,6 +42,13 @@ def verify_output_json(output, i="\b"):
     else:
         output["include_maybe"] = False
 
+    if "archive" in output:
+        if not isinstance(output["archive"], bool):
+            logging.error("The archive flag of an Output must be a boolean.")
+            return False
+    else:
+        output["archive"] = False
+
     return True
 
 
@@ -107,6 +114,7 @@ def import_profile_json(cache, profile_json):
             targets.get(output["target"]),
             output["output_dir"],
             output["include_maybe"],
+            output["archive"],
         )
 
     return profile
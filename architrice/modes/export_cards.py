@@ -0,0 +1,28 @@
+import logging
+
+from ..targets import card_info
+
+from . import cli
+from . import mode
+
+
+class ExportCards(mode.Mode):
+    def __init__(self):
+        super().__init__(
+            "x",
+            "export-cards",
+            "export card database to file (-p) for --import-cards",
+            ["path"],
+        )
+
+    def resolve_missing_arg(self, cache, arg, args):
+        if arg != "path":
+            raise ValueError(f"Can't resolve missing argument: {arg}.")
+
+        if args.interactive:
+            return cli.get_path("File to export card data to")
+        return None
+
+    def action(self, cache, args):
+        n = card_info.export_card_list(args.path)
+        logging.info(f"Exported {n} printings to {args.path}.")
@@ -0,0 +1,38 @@
+import logging
+import os
+
+from ..targets import card_info
+
+from . import cli
+from . import mode
+
+
+class ImportCards(mode.Mode):
+    def __init__(self):
+        super().__init__(
+            "X",
+            "import-cards",
+            "import card database from file (-p) made by --export-cards",
+            ["path"],
+        )
+
+    def resolve_missing_arg(self, cache, arg, args):
+        if arg != "path":
+            raise ValueError(f"Can't resolve missing argument: {arg}.")
+
+        if args.interactive:
+            return cli.get_path("Card data file to import")
+        return None
+
+    def action(self, cache, args):
+        if not os.path.isfile(args.path):
+            logging.error(f"{args.path} is not a file.")
+            return
+
+        try:
+            n = card_info.import_card_list(args.path)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            logging.error(f"Failed to import card data: {e}")
+            return
+
+        logging.info(f"Imported {n} printings from {args.path}.")
@@ -0,0 +1,125 @@
+import logging
+import sys
+
+from .. import database
+from ..targets import card_info
+
+from . import mode
+
+
+class Maintain(mode.Mode):
+    # A full VACUUM rewrites the whole database, so is only run when at least
+    # this fraction of its pages are free.
+    VACUUM_THRESHOLD = 0.25
+
+    def __init__(self):
+        super().__init__(
+            "M",
+            "maintain-db",
+            "check, optimise and report on the database and exit",
+        )
+
+    def main(self, args):
+        # The profile cache isn't needed, so this doesn't load it.
+        database.init()
+        try:
+            ok = self.check_integrity()
+            if ok:
+                self.analyze()
+                self.vacuum()
+                self.rebuild_card_snapshot()
+                self.report_sizes()
+                self.report_indexes()
+        finally:
+            database.close()
+
+        if not ok:
+            sys.exit(1)
+
+    def check_integrity(self):
+        results = [
+            result for result, in database.execute("PRAGMA integrity_check;")
+        ]
+        if results == ["ok"]:
+            logging.info("Database integrity check passed.")
+            return True
+
+        for result in results:
+            logging.error(f"Database integrity check: {result}")
+        logging.error("Database integrity check failed. Skipping maintenance.")
+        return False
+
+    def analyze(self):
+        database.execute("ANALYZE;")
+        database.commit()
+        logging.info("Updated query planner statistics.")
+
+    def vacuum(self):
+        page_count = database.pragma("page_count")
+        free_pages = database.pragma("freelist_count")
+        if not free_pages:
+            logging.info("No free pages to reclaim.")
+            return
+
+        auto_vacuum = database.pragma("auto_vacuum")
+        if auto_vacuum == database.Database.AUTO_VACUUM_MODES["INCREMENTAL"]:
+            # Stepping this PRAGMA through a cursor only frees a single page,
+            # so it's run as a script.
+            database.execute_script("PRAGMA incremental_vacuum;")
+        elif free_pages / page_count >= Maintain.VACUUM_THRESHOLD:
+            database.commit()
+            database.execute("VACUUM;")
+        else:
+            logging.info(
+                f"{free_pages} of {page_count} pages free, not vacuuming."
+            )
+            return
+
+        reclaimed = free_pages - database.pragma("freelist_count")
+        page_size = database.pragma("page_size")
+        logging.info(f"Reclaimed {reclaimed * page_size / 1024:.0f}KiB.")
+
+    def rebuild_card_snapshot(self):
+        if database.select_one("card_names", "id") is not None:
+            card_info.rebuild_snapshot()
+            logging.info("Rebuilt card snapshot.")
+
+    def report_sizes(self):
+        size = database.pragma("page_count") * database.pragma("page_size")
+        logging.info(f"Database size: {size / 1024:.0f}KiB.")
+
+        if list(
+            database.execute(
+                "SELECT 1 FROM pragma_compile_options "
+                "WHERE compile_options = 'ENABLE_DBSTAT_VTAB';"
+            )
+        ):
+            for name, size in database.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name "
+                "ORDER BY 2 DESC, name;"
+            ):
+                logging.info(f"\t{name}: {size / 1024:.0f}KiB")
+        else:
+            for (name,) in list(
+                database.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' "
+                    "ORDER BY name;"
+                )
+            ):
+                count = list(database.execute(f"SELECT COUNT(*) FROM {name};"))
+                logging.info(f"\t{name}: {count[0][0]} rows")
+
+    def report_indexes(self):
+        # sqlite_stat1 is populated by ANALYZE. Its stat column is the number
+        # of rows in the index followed by the average number of rows matching
+        # each prefix of the indexed columns.
+        logging.info("Index statistics:")
+        for table, index, stat in database.execute(
+            "SELECT tbl, idx, stat FROM sqlite_stat1 "
+            "WHERE idx IS NOT NULL ORDER BY tbl, idx;"
+        ):
+            rows, *per_value = stat.split()
+            logging.info(
+                f"\t{index} on {table}: {rows} rows, "
+                f"~{per_value[-1] if per_value else rows} rows per key"
+            )
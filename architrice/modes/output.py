@@ -20,6 +20,7 @@ class AddOutput(mode.Mode):
             args.target,
             args.path,
             args.include_maybe,
+            args.archive,
         )
 
     def load_cache(self, args):
@@ -30,6 +30,7 @@ class AddProfile(mode.Mode):
             args.target,
             args.path,
             args.include_maybe,
+            args.archive,
         )
 
         return profile
@@ -6,6 +6,7 @@ import sys
 from .. import utils
 
 from . import cli
+from . import common
 from . import mode
 
 APP_NAME = utils.APP_NAME
@@ -145,9 +146,9 @@ class Relnk(mode.Mode):
             "r", "relink", "edit shortcuts to run architrice", ["target"]
         )
 
-    def main(args):
+    def main(self, args):
         if os.name == "nt":
-            target = utils.get_target(args.target, args.interactive)
+            target = common.get_target(args.target, args.interactive)
             if not target:
                 logging.info(
                     "Unable to set up shortcuts as no target has been provided."
@@ -1,5 +1,3 @@
-import requests
-
 from .. import utils
 
 from . import source
@@ -23,17 +21,19 @@ class Archidekt(source.Source):
             c = (card["quantity"], card["card"]["oracleCard"]["name"])
 
             if "Commander" in card["categories"]:
-                d.commanders.append(c)
+                d.add_card(c, "commanders")
             elif "Maybeboard" in card["categories"]:
-                d.maybe.append(c)
+                d.add_card(c, "maybe")
             elif "Sideboard" in card["categories"]:
-                d.side.append(c)
+                d.add_card(c, "side")
             else:
-                d.main.append(c)
+                d.add_card(c, "main")
 
         return d
 
     def _get_deck(self, deck_id, small=True):
+        import requests
+
         return self.deck_to_generic_format(
             deck_id,
             requests.get(
@@ -55,6 +55,8 @@ class Archidekt(source.Source):
         return ret
 
     def _get_deck_list(self, username, allpages=True):
+        import requests
+
         decks = []
         url = self.format_api_request(
             f"cards/?owner={username}&ownerexact=true"
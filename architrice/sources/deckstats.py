@@ -1,8 +1,5 @@
 import re
 
-import bs4
-import requests
-
 from .. import utils
 
 from . import source
@@ -28,9 +25,9 @@ class Deckstats(source.Source):
         for section in deck.get("sections", []):
             for card in section.get("cards", []):
                 if card.get("isCommander", False):
-                    d.commanders.append(self.card_json_to_card(card))
+                    d.add_card(self.card_json_to_card(card), "commanders")
                 else:
-                    d.main.append(self.card_json_to_card(card))
+                    d.add_card(self.card_json_to_card(card), "main")
 
         for board in ["sideboard", "maybeboard"]:
             for card in deck.get(board, []):
@@ -48,6 +45,8 @@ class Deckstats(source.Source):
     # It is for this reason that params is not used in requests.get, as it would
     # escape ampersands in the id.
     def _get_deck(self, deck_id):
+        import requests
+
         return self.deck_to_generic_format(
             deck_id,
             requests.get(
@@ -58,6 +57,9 @@ class Deckstats(source.Source):
         )
 
     def get_user_id(self, username):
+        import bs4
+        import requests
+
         html = requests.get(
             f"{Deckstats.URL_BASE}members/search/?search_name={username}"
         ).content.decode()
@@ -71,6 +73,8 @@ class Deckstats(source.Source):
             return None
 
     def _get_deck_list(self, username):
+        import requests
+
         user_id = self.get_user_id(username)
 
         decks = []
@@ -1,6 +1,5 @@
 import logging
 import time
-import requests
 
 from .. import utils
 
@@ -24,6 +23,8 @@ class Moxfield(source.Source):
         self._logged_wait = False
 
     def _request(self, url, *, params=None):
+        import requests
+
         resp = requests.get(
             url, params=params, headers={"User-Agent": utils.user_agent()}
         )
@@ -1,8 +1,5 @@
 import re
 
-import bs4
-import requests
-
 from .. import utils
 
 from . import source
@@ -34,25 +31,21 @@ class TappedOut(source.Source):
         SIDEBOARD_SEPERATOR = "\n\n"
         if SIDEBOARD_SEPERATOR in mtga_deck:
             main_string, side_string = mtga_deck.split(SIDEBOARD_SEPERATOR)
-            d.main.extend(self.parse_to_cards(main_string))
-            d.side.extend(self.parse_to_cards(side_string))
+            main = self.parse_to_cards(main_string)
+            d.add_cards(self.parse_to_cards(side_string), "side")
         else:
-            d.main.extend(self.parse_to_cards(mtga_deck))
-
-        # Move commanders to correct list
-        to_move = []
-        for tup in d.main:
-            _, card = tup
-            if card in commanders:
-                to_move.append(tup)
+            main = self.parse_to_cards(mtga_deck)
 
-        for card in to_move:
-            d.main.remove(card)
-            d.commanders.append(card)
+        # Commanders are listed in the main deck, so move them to their board.
+        d.add_cards([c for c in main if c[1] in commanders], "commanders")
+        d.add_cards([c for c in main if c[1] not in commanders], "main")
 
         return d
 
     def _get_deck(self, deck_id):
+        import bs4
+        import requests
+
         # TappedOut offers a few export formats, but none of them include deck
         # name, deck description, or specify which cards are commanders.
         # Therefore we scrape the HTML with bs4 instead.
@@ -125,6 +118,9 @@ class TappedOut(source.Source):
             return 1
 
     def _get_deck_list(self, username, allpages=True):
+        import bs4
+        import requests
+
         decks = []
 
         url_base = f"{TappedOut.URL_BASE}users/{username}/mtg-decks/"
@@ -0,0 +1,133 @@
+import logging
+import os
+import secrets
+import threading
+
+# Deck files are written to a temporary file alongside their final path, and
+# only moved into place once the whole batch has been written. A crash part
+# way through a sync leaves the previous version of each deck file, rather
+# than a truncated one which the client can't load.
+#
+# The temporary files aren't synced individually, as that would cost an fsync
+# per deck. Instead each directory is synced once after the renames of its
+# batch. This relies on the filesystem writing out a file's data before a
+# rename which replaces another file, as ext4 (auto_da_alloc) and btrfs do.
+# Elsewhere a crash just after a sync may leave empty deck files.
+
+TEMP_FILE_SUFFIX = ".architrice-tmp"
+
+
+def temp_path_for(path):
+    directory, file_name = os.path.split(path)
+    return os.path.join(
+        directory, f".{file_name}.{secrets.token_hex(4)}{TEMP_FILE_SUFFIX}"
+    )
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        logging.debug(f"Failed to remove temporary file {path}: {e}")
+
+
+def sync_file(path):
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def sync_directory(directory):
+    # Directories can't be opened, or synced, on Windows, where a rename is
+    # durable once MoveFileEx returns.
+    if os.name == "nt":
+        return
+
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AtomicFile:
+    """A text file which is moved to its path when its batch is committed."""
+
+    def __init__(self, batch, path, encoding=None, errors=None):
+        self.batch = batch
+        self.path = path
+        self.temp_path = temp_path_for(path)
+        self.file = open(self.temp_path, "x", encoding=encoding, errors=errors)
+
+    def __enter__(self):
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.file.close()
+        except OSError:
+            remove_quietly(self.temp_path)
+            raise
+
+        if exc_type is None:
+            self.batch.add(self.temp_path, self.path)
+        else:
+            remove_quietly(self.temp_path)
+
+
+class AtomicWriteBatch:
+    """Collects files written with open, then moves them all into place when
+    committed. Used as a context manager, it commits on exit, or discards the
+    files written if an exception was raised.
+
+    Files may be opened from several threads at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []  # (temp_path, path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def open(self, path, encoding=None, errors=None):
+        return AtomicFile(self, path, encoding, errors)
+
+    def add(self, temp_path, path):
+        with self.lock:
+            self.pending.append((temp_path, path))
+
+    def abort(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+
+        for temp_path, _ in pending:
+            remove_quietly(temp_path)
+
+    def commit(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+
+        if not pending:
+            return
+
+        renamed = 0
+        try:
+            for temp_path, path in pending:
+                os.replace(temp_path, path)
+                renamed += 1
+        finally:
+            for temp_path, _ in pending[renamed:]:
+                remove_quietly(temp_path)
+
+        for directory in {
+            os.path.dirname(path) or os.curdir for _, path in pending
+        }:
+            sync_directory(directory)
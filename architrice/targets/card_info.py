@@ -1,18 +1,34 @@
 import functools
+import gzip
+import itertools
+import json
 import logging
+import os
 import re
-
-import requests
+import threading
 
 from .. import database
 from .. import deckreprs
 from .. import utils
 
+from . import card_snapshot
+
 SCRYFALL_BULK_DATA_URL = "https://api.scryfall.com/bulk-data/default-cards"
 # Scryfall updates its card list every 24 hours.
 # We will update no more frequently than this as it is a large download.
 CARD_LIST_UPDATE_INTERVAL = 60 * 60 * 24
 
+# Held while updating the card database, as cards may be looked up from
+# several threads at once.
+update_lock = threading.Lock()
+
+# Compiled snapshot of the printing find chooses for each card name, rebuilt
+# whenever the card list is updated. Loaded on first use.
+SNAPSHOT_FILE = "cards.snapshot"
+snapshot_lock = threading.Lock()
+snapshot = None
+snapshot_loaded = False
+
 # Could consider Ascii normalising card names upon database insertion. This
 # would make it easier to find cards with accents in names. However, some
 # targets, like Cockatrice, need the accents in card names.
@@ -71,25 +87,194 @@ def save_card_info(data):
 
         records.append(card_info_tuple(card))
 
-    database.insert_many_tuples(
-        "cards",
+    insert_card_tuples(records)
+
+
+def insert_card_tuples(records):
+    """Insert (name, mtgo_id, is_dfc, collector_number, edition, reprint)
+    tuples into the card tables, ignoring printings which are already known."""
+
+    names = {}
+    editions = set()
+    for name, _, is_dfc, _, edition, _ in records:
+        names.setdefault(name, is_dfc)
+        editions.add(edition)
+
+    with database.transaction():
+        database.insert_many_tuples(
+            "card_names", ["name", "is_dfc"], names.items(), conflict="ignore"
+        )
+        database.insert_many_tuples(
+            "editions", ["code"], [(e,) for e in editions], conflict="ignore"
+        )
+
+        name_ids = dict(
+            database.select_where_in(
+                "card_names", "name", names, ["name", "id"]
+            )
+        )
+        edition_ids = dict(
+            database.select_where_in(
+                "editions", "code", editions, ["code", "id"]
+            )
+        )
+
+        database.insert_many_tuples(
+            "printings",
+            ["name", "edition", "collector_number", "mtgo_id", "reprint"],
+            [
+                (
+                    name_ids[name],
+                    edition_ids[edition],
+                    collector_number,
+                    mtgo_id,
+                    reprint,
+                )
+                for (
+                    name,
+                    mtgo_id,
+                    _,
+                    collector_number,
+                    edition,
+                    reprint,
+                ) in records
+            ],
+            conflict="ignore",
+        )
+
+
+# Card lists exported by export_card_list, for import by import_card_list.
+CARD_LIST_FORMAT = "architrice-cards"
+CARD_LIST_VERSION = 1
+
+
+def export_card_list(path):
+    """Write the card database to path as gzipped JSON. Returns the number of
+    printings written.
+
+    Names and editions are written once each and referred to by their index
+    from printings, along with the time and URI of the Scryfall download the
+    cards came from.
+    """
+
+    names = list(database.execute("SELECT id, name, is_dfc FROM card_names;"))
+    editions = list(database.execute("SELECT id, code FROM editions;"))
+    name_indices = {db_id: i for i, (db_id, *_) in enumerate(names)}
+    edition_indices = {db_id: i for i, (db_id, _) in enumerate(editions)}
+
+    time, uri = database.select_one(
+        "database_events",
+        ["time", "data"],
+        id=database.DatabaseEvents.CARD_LIST_UPDATE.value,
+    ) or (0, None)
+
+    printings = [
         [
-            "name",
-            "mtgo_id",
-            "is_dfc",
-            "collector_number",
-            "edition",
-            "reprint",
-        ],
-        records,
-        conflict="ignore",
+            name_indices[name],
+            edition_indices[edition],
+            collector_number,
+            mtgo_id,
+            reprint,
+        ]
+        for name, edition, collector_number, mtgo_id, reprint in (
+            database.execute(
+                "SELECT name, edition, collector_number, mtgo_id, reprint "
+                "FROM printings;"
+            )
+        )
+    ]
+
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format": CARD_LIST_FORMAT,
+                "version": CARD_LIST_VERSION,
+                "time": time,
+                "uri": uri,
+                "names": [[name, is_dfc] for _, name, is_dfc in names],
+                "editions": [code for _, code in editions],
+                "printings": printings,
+            },
+            f,
+            separators=(",", ":"),
+        )
+
+    return len(printings)
+
+
+def import_card_list(path):
+    """Add the cards in a file written by export_card_list to the database.
+    Returns the number of printings read.
+
+    If the cards come from a newer Scryfall download than the local database,
+    its time and URI are recorded so that update_card_list doesn't download
+    them again.
+    """
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict) or data.get("format") != CARD_LIST_FORMAT:
+        raise ValueError(f"{path} is not an exported card list.")
+    if data.get("version") != CARD_LIST_VERSION:
+        raise ValueError(
+            f"Unsupported card list version: {data.get('version')}."
+        )
+
+    names = data["names"]
+    editions = data["editions"]
+    records = []
+    for name, edition, collector_number, mtgo_id, reprint in data["printings"]:
+        name, is_dfc = names[name]
+        records.append(
+            (
+                name,
+                mtgo_id,
+                is_dfc,
+                collector_number,
+                editions[edition],
+                reprint,
+            )
+        )
+    insert_card_tuples(records)
+
+    time = database.select_one_column(
+        "database_events",
+        "time",
+        id=database.DatabaseEvents.CARD_LIST_UPDATE.value,
     )
-    database.commit()
+    if data["uri"] and data["time"] > (time or 0):
+        database.upsert(
+            "database_events",
+            id=database.DatabaseEvents.CARD_LIST_UPDATE.value,
+            time=data["time"],
+            data=data["uri"],
+        )
+        database.commit()
+
+    rebuild_snapshot()
 
+    return len(records)
+
+
+def record_card_list_update(url):
+    # Committed straight away, so that threads reading through their own
+    # connections see it and don't check for an update again.
+    with database.transaction():
+        database.upsert(
+            "database_events",
+            id=database.DatabaseEvents.CARD_LIST_UPDATE.value,
+            time=utils.time_now(),
+            data=url,
+        )
 
-# Note: this should only be called from one thread at a time.
+
+# Note: this should only be called from one thread at a time, holding
+# update_lock.
 # Returns bool indicating whether the database was actually updated.
 def update_card_list():
+    import requests
+
     time, url = database.select_one(
         "database_events",
         ["time", "data"],
@@ -100,15 +285,9 @@ def update_card_list():
 
     download_info = requests.get(SCRYFALL_BULK_DATA_URL).json()
 
-    database.upsert(
-        "database_events",
-        id=database.DatabaseEvents.CARD_LIST_UPDATE.value,
-        time=utils.time_now(),
-        data=download_info["download_uri"],
-    )
-
     if download_info["download_uri"] == url:
         logging.info("Latest Scryfall card list already downloaded.")
+        record_card_list_update(url)
         return
 
     logging.info(
@@ -122,6 +301,8 @@ def update_card_list():
     data = requests.get(download_info["download_uri"]).json()
 
     save_card_info(data)
+    record_card_list_update(download_info["download_uri"])
+    rebuild_snapshot()
 
     logging.info("Card database update complete.")
 
@@ -129,6 +310,8 @@ def update_card_list():
 
 
 def update_single(name):
+    import requests
+
     URL_BASE = "https://api.scryfall.com/cards/search"
     resp = requests.get(
         URL_BASE, params={"q": f'!"{name}"', "unique": "prints"}
@@ -144,17 +327,123 @@ def update_single(name):
         )
 
 
+# choose_printing takes the first suitable printing of a card, so both the
+# database and the snapshot see each card's printings in this order.
+PRINTING_ORDER = "ORDER BY p.name, p.edition, p.collector_number"
+
+# Selects records in the format expected by deckreprs.Card.from_record, for
+# card names matching a condition.
+SELECT_CARDS = (
+    "SELECT n.name, p.mtgo_id, n.is_dfc, p.collector_number, e.code, "
+    "p.reprint FROM card_names n JOIN printings p ON p.name = n.id "
+    "JOIN editions e ON p.edition = e.id WHERE n.name {} "
+    + PRINTING_ORDER
+    + ";"
+)
+
+
+# All printings, grouped by card name in the order find sees them.
+SELECT_ALL_CARDS = (
+    "SELECT n.name, p.mtgo_id, n.is_dfc, p.collector_number, e.code, "
+    "p.reprint FROM printings p JOIN card_names n ON p.name = n.id "
+    "JOIN editions e ON p.edition = e.id " + PRINTING_ORDER + ";"
+)
+
+
+def choose_printing(matches, mtgo_id_required=False):
+    """Return the record of the printing to use from the records of a card's
+    printings, or None if there isn't a suitable one."""
+
+    # Try and get original printing
+    for tup in matches:
+        _, mtgo_id, *_, reprint = tup
+
+        if not reprint and (mtgo_id or not mtgo_id_required):
+            return tup
+
+    # Settle for any printing
+    for tup in matches:
+        _, mtgo_id, *_ = tup
+
+        if mtgo_id or not mtgo_id_required:
+            return tup
+
+    return None
+
+
+def snapshot_path():
+    return os.path.join(utils.DATA_DIR, SNAPSHOT_FILE)
+
+
+def get_snapshot():
+    global snapshot, snapshot_loaded
+
+    with snapshot_lock:
+        if not snapshot_loaded:
+            snapshot = card_snapshot.load(snapshot_path())
+            snapshot_loaded = True
+        return snapshot
+
+
+def reset_snapshot():
+    # The old snapshot isn't closed as other threads may be reading it. Its
+    # map is released when it is no longer referenced.
+    global snapshot, snapshot_loaded
+
+    with snapshot_lock:
+        snapshot = None
+        snapshot_loaded = False
+
+
+def rebuild_snapshot():
+    """Compile a snapshot of the card database for find to use."""
+
+    def printing(tup):
+        # (mtgo_id, collector_number, edition) of a record, if there is one.
+        return tup and (tup[1], tup[3], tup[4])
+
+    def cards():
+        for name, group in itertools.groupby(
+            database.execute(SELECT_ALL_CARDS), key=lambda tup: tup[0]
+        ):
+            group = list(group)
+            yield (
+                name,
+                group[0][2],
+                printing(choose_printing(group)),
+                printing(choose_printing(group, mtgo_id_required=True)),
+            )
+
+    try:
+        card_snapshot.compile_snapshot(snapshot_path(), cards())
+    except OSError as e:
+        logging.warning(f"Failed to write card snapshot: {e}")
+    reset_snapshot()
+
+
+def remove_snapshot():
+    try:
+        os.remove(snapshot_path())
+    except FileNotFoundError:
+        pass
+    reset_snapshot()
+
+
 @functools.lru_cache(maxsize=None)  # cache to save repeated db queries
 def find(name, mtgo_id_required=False, update_if_necessary=True):
-    matches = list(database.select("cards", name=name))
+    compiled = get_snapshot()
+    if compiled is not None:
+        card = compiled.find(name, mtgo_id_required)
+        if card is not None:
+            return card
+
+    matches = list(database.execute(SELECT_CARDS.format("= ?"), (name,)))
     if not matches:
         # Some websites don't include the back face of cards in the name.
         # Luckily, card face names are unique, so we can simply match cards
         # whose name starts with the front face name.
         matches = list(
-            database.execute(
-                "SELECT * FROM cards WHERE name LIKE ?;", (name + " // %",)
-            )
+            database.execute(SELECT_CARDS.format("LIKE ?"), (name + " // %",))
         )
 
     if not matches:
@@ -163,30 +452,21 @@ def find(name, mtgo_id_required=False, update_if_necessary=True):
         # be able to find them by replacing vowels with wildcards.
         matches = list(
             database.execute(
-                "SELECT * FROM cards WHERE name LIKE ?;",
+                SELECT_CARDS.format("LIKE ?"),
                 (wildcard_vowels(name),),
             )
         )
 
-    # Try and get original printing
-    for tup in matches:
-        _, _, mtgo_id, *_, reprint = tup
-
-        if not reprint and (mtgo_id or not mtgo_id_required):
-            return deckreprs.Card.from_record(tup)
-
-    # Settle for any printing
-    for tup in matches:
-        _, _, mtgo_id, *_ = tup
-
-        if mtgo_id or not mtgo_id_required:
-            return deckreprs.Card.from_record(tup)
+    tup = choose_printing(matches, mtgo_id_required)
+    if tup is not None:
+        return deckreprs.Card.from_record(tup)
 
     if update_if_necessary:
         logging.debug(f"Missing card info for {name}. Updating database.")
 
-        if not update_card_list():
-            update_single(name)
+        with update_lock:
+            if not update_card_list():
+                update_single(name)
         return find(
             name, mtgo_id_required=mtgo_id_required, update_if_necessary=False
         )
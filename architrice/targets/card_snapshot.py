@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+
+from .. import deckreprs
+
+# A snapshot is a read-only file holding, for each card name, the printings
+# card_info.find would choose with and without an MTGO id required. It is
+# memory mapped, so lookups don't query the database and processes share the
+# file through the page cache.
+#
+# Layout, all little endian:
+#   header  : HEADER
+#   hashes  : sorted HASH of each name
+#   offsets : OFFSET of the record of each name, in the order of hashes
+#   records : RECORD, the name, then PRINTING, collector number and edition
+#             for each printing flagged as present
+
+MAGIC = b"ACS\x00"
+VERSION = 1
+
+HEADER = struct.Struct("<4sII")  # magic, version, number of names
+HASH = struct.Struct("<Q")
+OFFSET = struct.Struct("<I")
+RECORD = struct.Struct("<HBB")  # name length, is_dfc, printing flags
+PRINTING = struct.Struct("<IBB")  # mtgo_id, collector number and edition len
+
+# Flags for the printings present in a record.
+HAS_PRINTING = 1
+HAS_MTGO_PRINTING = 2
+
+
+def name_hash(name_bytes):
+    return HASH.unpack(hashlib.blake2b(name_bytes, digest_size=8).digest())[0]
+
+
+def pack_printing(printing):
+    mtgo_id, collector_number, edition = printing
+    collector_number = collector_number.encode()
+    edition = edition.encode()
+    return (
+        PRINTING.pack(int(mtgo_id or 0), len(collector_number), len(edition))
+        + collector_number
+        + edition
+    )
+
+
+def compile_snapshot(path, cards):
+    """Write a snapshot to path, replacing any existing one.
+
+    cards is an iterable of (name, is_dfc, printing, mtgo_printing) tuples,
+    where each printing is a (mtgo_id, collector_number, edition) tuple, or
+    None if there is no such printing.
+    """
+
+    entries = []
+    records = []
+    offset = 0
+    for name, is_dfc, printing, mtgo_printing in cards:
+        name_bytes = name.encode()
+        flags = (HAS_PRINTING if printing else 0) | (
+            HAS_MTGO_PRINTING if mtgo_printing else 0
+        )
+
+        record = RECORD.pack(len(name_bytes), is_dfc, flags) + name_bytes
+        if printing:
+            record += pack_printing(printing)
+        if mtgo_printing:
+            record += pack_printing(mtgo_printing)
+
+        entries.append((name_hash(name_bytes), offset))
+        records.append(record)
+        offset += len(record)
+    entries.sort()
+
+    # Written to a temporary file and moved into place so that processes
+    # with the old snapshot mapped keep a consistent view of it.
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+            f.write(b"".join(HASH.pack(h) for h, _ in entries))
+            f.write(b"".join(OFFSET.pack(o) for _, o in entries))
+            f.write(b"".join(records))
+        os.replace(temp_path, path)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+    logging.debug(f"Compiled card snapshot of {len(entries)} cards.")
+
+
+class CardSnapshot:
+    def __init__(self, f):
+        self.file = f
+        self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("Unsupported card snapshot format.")
+
+        self.hashes_start = HEADER.size
+        self.offsets_start = self.hashes_start + self.count * HASH.size
+        self.records_start = self.offsets_start + self.count * OFFSET.size
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def hash_at(self, i):
+        return HASH.unpack_from(self.map, self.hashes_start + i * HASH.size)[0]
+
+    def record_offset(self, i):
+        (offset,) = OFFSET.unpack_from(
+            self.map, self.offsets_start + i * OFFSET.size
+        )
+        return self.records_start + offset
+
+    def unpack_printing(self, name, is_dfc, offset):
+        mtgo_id, cn_length, edition_length = PRINTING.unpack_from(
+            self.map, offset
+        )
+        offset += PRINTING.size
+        collector_number = self.map[offset : offset + cn_length].decode()
+        offset += cn_length
+        edition = self.map[offset : offset + edition_length].decode()
+        return deckreprs.Card(
+            name,
+            str(mtgo_id) if mtgo_id else None,
+            is_dfc,
+            collector_number,
+            edition,
+        )
+
+    def find(self, name, mtgo_id_required=False):
+        """Return the Card to use for name, or None if it isn't in the
+        snapshot."""
+
+        name_bytes = name.encode()
+        target = name_hash(name_bytes)
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.hash_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # Check each name with this hash, in case of a collision.
+        while lo < self.count and self.hash_at(lo) == target:
+            offset = self.record_offset(lo)
+            lo += 1
+
+            name_length, is_dfc, flags = RECORD.unpack_from(self.map, offset)
+            offset += RECORD.size
+            if self.map[offset : offset + name_length] != name_bytes:
+                continue
+            offset += name_length
+
+            if mtgo_id_required:
+                if not flags & HAS_MTGO_PRINTING:
+                    return None
+                if flags & HAS_PRINTING:
+                    # Skip over the printing used without an MTGO id.
+                    _, cn_length, edition_length = PRINTING.unpack_from(
+                        self.map, offset
+                    )
+                    offset += PRINTING.size + cn_length + edition_length
+            elif not flags & HAS_PRINTING:
+                return None
+
+            return self.unpack_printing(name, is_dfc, offset)
+
+        return None
+
+
+def load(path):
+    """Open the snapshot at path, returning None if there isn't a valid one."""
+
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    try:
+        return CardSnapshot(f)
+    except (ValueError, struct.error) as e:
+        f.close()
+        logging.debug(f"Ignoring card snapshot: {e}")
+        return None
@@ -1,10 +1,9 @@
-from architrice.targets.card_info import CARD_LIST_UPDATE_INTERVAL
 import os
-import xml.etree.cElementTree as et
 
 from .. import utils
 
 from . import target
+from . import xml_writer
 
 
 # TODO Desktop/cockatrice_portable/data/decks
@@ -24,6 +23,8 @@ class Cockatrice(target.Target):
     SHORTCUT_NAME = "Cockatrice.lnk"
     EXECUTABLE_NAME = "cockatrice"
     SUPPORTS_RELNK = True
+    ENCODING = xml_writer.ENCODING
+    ENCODING_ERRORS = xml_writer.ENCODING_ERRORS
 
     def __init__(self):
         super().__init__(
@@ -35,33 +36,28 @@ class Cockatrice(target.Target):
     def suggest_directory(self):
         return Cockatrice.DECK_DIRECTORY
 
-    def _save_deck(self, deck, path, include_maybe=False, card_info_map=None):
-        self.deck_to_xml(deck, path, include_maybe, card_info_map)
-
-    def deck_to_xml(self, deck, outfile, include_maybe, card_info_map=None):
-        root = et.Element("cockatrice_deck", version="1")
-
-        et.SubElement(root, "deckname").text = deck.name
-        et.SubElement(root, "comments").text = deck.description
-
-        main = et.SubElement(root, "zone", name="main")
-        side = et.SubElement(root, "zone", name="side")
-
-        for quantity, name in deck.get_main_deck():
-            et.SubElement(
-                main,
-                "card",
-                number=str(quantity),
-                name=self.front_face_name(name, card_info_map),
-            )
-        for quantity, name in deck.get_sideboard(include_maybe=include_maybe):
-            et.SubElement(
-                side,
-                "card",
-                number=str(quantity),
-                name=self.front_face_name(name, card_info_map),
-            )
-
-        et.ElementTree(root).write(
-            outfile, xml_declaration=True, encoding="UTF-8"
-        )
+    def render_card(self, name, info):
+        name = xml_writer.escape_attribute(self.front_face_name(name, info))
+        return f' name="{name}" />'
+
+    def write_deck(self, deck, f, include_maybe=False, card_info_map=None):
+        xml = xml_writer.XmlWriter(f.write)
+        xml.declaration("UTF-8")
+        xml.start("cockatrice_deck", {"version": "1"})
+
+        xml.element("deckname", text=deck.name)
+        xml.element("comments", text=deck.description)
+
+        for zone, cards in [
+            ("main", deck.get_main_deck()),
+            ("side", deck.get_sideboard(include_maybe=include_maybe)),
+        ]:
+            xml.start("zone", {"name": zone})
+            for quantity, name in cards:
+                xml.raw(
+                    f'<card number="{quantity}"'
+                    + self.card_fragment(name, card_info_map)
+                )
+            xml.end("zone")
+
+        xml.end("cockatrice_deck")
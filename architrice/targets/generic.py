@@ -1,5 +1,3 @@
-import os
-
 from . import target
 
 
@@ -13,21 +11,23 @@ class Generic(target.Target):
             Generic.NAME, Generic.SHORT, Generic.DECK_FILE_EXTENSION
         )
 
-    def canonical_name(self, name, card_info_map):
-        return card_info_map[name].name
-
-    def _save_deck(self, deck, path, include_maybe, card_info_map):
-
-        deck_string = ""
-        for quantity, name in deck.get_main_deck():
-            deck_string += (
-                f"{quantity} {self.canonical_name(name, card_info_map)}\n"
+    def render_card(self, name, info):
+        if info is None:
+            raise KeyError(name)
+        return f" {info.name}\n"
+
+    def card_lines(self, card_list, card_info_map):
+        return [
+            f"{quantity}{self.card_fragment(name, card_info_map)}"
+            for quantity, name in card_list
+        ]
+
+    def write_deck(self, deck, f, include_maybe=False, card_info_map=None):
+        lines = self.card_lines(deck.get_main_deck(), card_info_map)
+        lines.append("\n")
+        lines.extend(
+            self.card_lines(
+                deck.get_sideboard(include_maybe=include_maybe), card_info_map
             )
-        deck_string += "\n"
-        for quantity, name in deck.get_sideboard(include_maybe=include_maybe):
-            deck_string += (
-                f"{quantity} {self.canonical_name(name, card_info_map)}\n"
-            )
-
-        with open(path, "w") as f:
-            f.write(deck_string)
+        )
+        f.write("".join(lines))
@@ -1,10 +1,10 @@
 import logging
 import os
-import xml.etree.cElementTree as et
 
 from .. import utils
 
 from . import target
+from . import xml_writer
 
 
 class Mtgo(target.Target):
@@ -37,6 +37,8 @@ class Mtgo(target.Target):
     DECK_FILE_EXTENSION = ".dek"
     SHORTCUT_NAME = "Magic The Gathering Online.lnk"
     SUPPORTS_RELNK = True
+    ENCODING = xml_writer.ENCODING
+    ENCODING_ERRORS = xml_writer.ENCODING_ERRORS
 
     def __init__(self):
         super().__init__(Mtgo.NAME, Mtgo.SHORT, Mtgo.DECK_FILE_EXTENSION)
@@ -48,49 +50,49 @@ class Mtgo(target.Target):
                 return directory
         return super().suggest_directory()
 
-    def _save_deck(self, deck, path, include_maybe, card_info_map=None):
-        return deck_to_xml(deck, path, include_maybe, card_info_map)
-
-
-def mtgo_name(name):
-    return name.partition("//")[0].strip()
+    def render_card(self, name, info):
+        if not (info and info.mtgo_id):
+            return None
 
+        # The card's quantity and sideboard flag go between these.
+        return (
+            f'<Cards CatID="{xml_writer.escape_attribute(str(info.mtgo_id))}"'
+            ' Quantity="',
+            f'" Name="{xml_writer.escape_attribute(mtgo_name(name))}"'
+            ' Annotation="0" />',
+        )
 
-def add_card(root, quantity, name, card_info_map, in_sideboard=False):
-    info = card_info_map.get(name)
-    if info and info.mtgo_id:
-        et.SubElement(
-            root,
-            "Cards",
+    def write_deck(self, deck, f, include_maybe=False, card_info_map=None):
+        xml = xml_writer.XmlWriter(f.write)
+        xml.declaration("utf-8")
+        xml.start(
+            "Deck",
             {
-                "CatID": info.mtgo_id,
-                "Quantity": str(quantity),
-                "Sideboard": "true" if in_sideboard else "false",
-                "Name": mtgo_name(name),
-                "Annotation": "0",
+                "xmlns:xsd": "http://www.w3.org/2001/XMLSchema",
+                "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
             },
-        )
-    else:
-        logging.info(
-            f"Couldn't find MTGO data for {name}." " It may not exist on MTGO."
-        )
+        )  # xmlns declaration that MTGO writes in its .dek files.
 
+        xml.element("NetDeckID", text="0")
+        xml.element("PreconstructedDeckID", text="0")
 
-def deck_to_xml(deck, outfile, include_maybe, card_info_map):
-    root = et.Element(
-        "Deck",
-        {
-            "xmlns:xsd": "http://www.w3.org/2001/XMLSchema",
-            "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
-        },
-    )  # xmlns declaration that MTGO writes in its .dek files.
+        for sideboard, cards in [
+            ("false", deck.get_main_deck()),
+            ("true", deck.get_sideboard(include_maybe=include_maybe)),
+        ]:
+            for quantity, name in cards:
+                fragment = self.card_fragment(name, card_info_map)
+                if fragment is None:
+                    logging.info(
+                        f"Couldn't find MTGO data for {name}."
+                        " It may not exist on MTGO."
+                    )
+                else:
+                    head, tail = fragment
+                    xml.raw(f'{head}{quantity}" Sideboard="{sideboard}{tail}')
 
-    et.SubElement(root, "NetDeckID").text = "0"
-    et.SubElement(root, "PreconstructedDeckID").text = "0"
+        xml.end("Deck")
 
-    for quantity, name in deck.get_main_deck():
-        add_card(root, quantity, name, card_info_map)
-    for quantity, name in deck.get_sideboard(include_maybe=include_maybe):
-        add_card(root, quantity, name, card_info_map, True)
 
-    et.ElementTree(root).write(outfile, xml_declaration=True, encoding="utf-8")
+def mtgo_name(name):
+    return name.partition("//")[0].strip()
@@ -1,14 +1,23 @@
 import abc
+import functools
+import io
 import os
 
 from .. import database
 from .. import utils
 
+from . import atomic_writer
 from . import card_info
 
+# The number of card fragments each target keeps, enough for the distinct
+# printings of a large collection.
+CARD_FRAGMENT_CACHE_SIZE = 8192
+
 
 class Target(database.KeyStoredObject, abc.ABC):
     SUPPORTS_RELNK = False
+    ENCODING = None  # Locale encoding
+    ENCODING_ERRORS = None
 
     def __init__(self, name, short, file_extension):
         database.KeyStoredObject.__init__(self, short)
@@ -18,6 +27,12 @@ class Target(database.KeyStoredObject, abc.ABC):
         self.file_extension = file_extension
         self.mtgo_id_required = False
 
+        # Caches the text rendered for (name, card info) by render_card, so
+        # that cards which appear in many decks are only rendered once.
+        self.render_card_cached = functools.lru_cache(
+            maxsize=CARD_FRAGMENT_CACHE_SIZE
+        )(self.render_card)
+
     def suggest_directory(self):
         if os.name == "nt":
             return utils.expand_path(
@@ -27,20 +42,56 @@ class Target(database.KeyStoredObject, abc.ABC):
             return utils.expand_path(os.path.join("~", "Decks"))
 
     @abc.abstractmethod
-    def _save_deck(self, deck, path, include_maybe=False, card_info_map=None):
-        """Writes deck to path in format using card_info_map."""
-
-    def front_face_name(self, name, card_info_map=None):
-        if card_info_map and name in card_info_map:
-            card = card_info_map[name]
-            if card.is_dfc:
-                return name.partition("//")[0].strip()
+    def write_deck(self, deck, f, include_maybe=False, card_info_map=None):
+        """Writes deck to the open text file f in format using card_info_map."""
+
+    def _save_deck(self, deck, path, include_maybe, card_info_map, batch):
+        """Writes deck to path in format using card_info_map, as part of the
+        AtomicWriteBatch batch."""
+        with batch.open(path, self.ENCODING, self.ENCODING_ERRORS) as f:
+            self.write_deck(deck, f, include_maybe, card_info_map)
+
+    @abc.abstractmethod
+    def render_card(self, name, info):
+        """Returns the fragment of deck file text for the card name, with card
+        info info, which may be None. Used through card_fragment."""
+
+    def card_fragment(self, name, card_info_map):
+        return self.render_card_cached(name, card_info_map.get(name))
+
+    def front_face_name(self, name, info=None):
+        if info and info.is_dfc:
+            return name.partition("//")[0].strip()
         return name
 
-    def save_deck(self, deck, path, include_maybe=False, card_info_map=None):
+    def render_deck(self, deck, include_maybe=False, card_info_map=None):
+        """Returns the bytes that save_deck would write to a deck file."""
+
         if card_info_map is None:
             card_info_map = card_info.map_from_deck(deck)
-        self._save_deck(deck, path, include_maybe, card_info_map)
+
+        buffer = io.BytesIO()
+        f = io.TextIOWrapper(
+            buffer, encoding=self.ENCODING, errors=self.ENCODING_ERRORS
+        )
+        self.write_deck(deck, f, include_maybe, card_info_map)
+        f.flush()
+        return buffer.getvalue()
+
+    def save_deck(
+        self, deck, path, include_maybe=False, card_info_map=None, batch=None
+    ):
+        """Writes deck to path. If batch is given, the file is only moved into
+        place when batch is committed."""
+
+        if card_info_map is None:
+            card_info_map = card_info.map_from_deck(deck)
+
+        if batch is None:
+            with atomic_writer.AtomicWriteBatch() as batch:
+                self._save_deck(deck, path, include_maybe, card_info_map, batch)
+        else:
+            self._save_deck(deck, path, include_maybe, card_info_map, batch)
 
     def save_decks(self, deck_tuples, include_maybe=False, card_info_map=None):
         if card_info_map is None:
@@ -49,8 +100,9 @@ class Target(database.KeyStoredObject, abc.ABC):
                 mtgo_id_required=self.mtgo_id_required,
             )
 
-        for deck, path in deck_tuples:
-            self.save_deck(deck, path, include_maybe, card_info_map)
+        with atomic_writer.AtomicWriteBatch() as batch:
+            for deck, path in deck_tuples:
+                self.save_deck(deck, path, include_maybe, card_info_map, batch)
 
     def create_file_name(self, deck_name):
         return utils.create_file_name(deck_name) + self.file_extension
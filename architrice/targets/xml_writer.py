@@ -0,0 +1,87 @@
+# Streaming XML output, formatted exactly as ElementTree.write formats the
+# equivalent element tree, without building the tree first.
+
+
+def escape_text(text):
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def escape_attribute(value):
+    if "&" in value:
+        value = value.replace("&", "&amp;")
+    if "<" in value:
+        value = value.replace("<", "&lt;")
+    if ">" in value:
+        value = value.replace(">", "&gt;")
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+    # Line breaks and tabs are kept as character references so that they
+    # aren't normalised to spaces when parsed.
+    if "\r" in value:
+        value = value.replace("\r", "&#13;")
+    if "\n" in value:
+        value = value.replace("\n", "&#10;")
+    if "\t" in value:
+        value = value.replace("\t", "&#09;")
+    return value
+
+
+# Deck files are encoded as ElementTree.write would encode them.
+ENCODING = "utf-8"
+ENCODING_ERRORS = "xmlcharrefreplace"
+
+
+class XmlWriter:
+    """Writes elements through write as they are started and ended.
+
+    Elements without text or children are written as <tag />, so a start tag
+    isn't closed until its content, or end, is written.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self.start_open = False
+
+    def declaration(self, encoding):
+        self.write(f"<?xml version='1.0' encoding='{encoding}'?>\n")
+
+    def close_start(self):
+        if self.start_open:
+            self.write(">")
+            self.start_open = False
+
+    def start(self, tag, attributes=None):
+        self.close_start()
+        self.write(f"<{tag}")
+        if attributes:
+            for key, value in attributes.items():
+                self.write(f' {key}="{escape_attribute(value)}"')
+        self.start_open = True
+
+    def raw(self, text):
+        """Write text, which must already be escaped, as content."""
+        self.close_start()
+        self.write(text)
+
+    def text(self, text):
+        if text:
+            self.close_start()
+            self.write(escape_text(text))
+
+    def end(self, tag):
+        if self.start_open:
+            self.write(" />")
+            self.start_open = False
+        else:
+            self.write(f"</{tag}>")
+
+    def element(self, tag, attributes=None, text=None):
+        self.start(tag, attributes)
+        self.text(text)
+        self.end(tag)
@@ -0,0 +1,101 @@
+import logging
+import os
+import shutil
+import warnings
+import zipfile
+
+from . import atomic_writer
+
+# Archive outputs keep every deck of an output in one zip file. Changed decks
+# are appended to the archive, replacing older members of the same name,
+# which zip readers skip in favour of the last member with each name. Once
+# the superseded members take up more space than the live ones, the archive
+# is compacted by rewriting it with only the live members.
+#
+# Changes are made to a copy of the archive, which then replaces it, so that
+# a crash part way through an update leaves the previous archive intact.
+
+
+def read_member_names(path):
+    """Return the set of member names of the archive at path, which is empty
+    if there isn't a readable archive there."""
+
+    if not os.path.exists(path):
+        return set()
+
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return set(archive.namelist())
+    except zipfile.BadZipFile as e:
+        logging.warning(f"Ignoring damaged archive {path}: {e}")
+        return set()
+
+
+def latest_members(infos):
+    """Return the last ZipInfo of each name in infos."""
+    return {info.filename: info for info in infos}.values()
+
+
+def superseded_size(infos):
+    return sum(info.compress_size for info in infos) - sum(
+        info.compress_size for info in latest_members(infos)
+    )
+
+
+def compact(path):
+    """Rewrite the archive at path with only the latest member of each name."""
+
+    temp_path = atomic_writer.temp_path_for(path)
+    try:
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(
+            temp_path, "w", zipfile.ZIP_DEFLATED
+        ) as destination:
+            for info in latest_members(source.infolist()):
+                destination.writestr(
+                    zipfile.ZipInfo(info.filename, info.date_time),
+                    source.read(info),
+                    zipfile.ZIP_DEFLATED,
+                )
+        os.replace(temp_path, path)
+    except BaseException:
+        atomic_writer.remove_quietly(temp_path)
+        raise
+
+
+def update(path, members):
+    """Add members, a dict from member name to bytes, to the archive at path,
+    replacing any existing members of the same names."""
+
+    temp_path = atomic_writer.temp_path_for(path)
+    try:
+        if zipfile.is_zipfile(path):
+            shutil.copyfile(path, temp_path)
+            mode = "a"
+        else:
+            if os.path.exists(path):
+                logging.warning(f"Replacing damaged archive {path}.")
+            mode = "w"
+
+        with zipfile.ZipFile(temp_path, mode, zipfile.ZIP_DEFLATED) as archive:
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", "Duplicate name", UserWarning)
+                for name, data in members.items():
+                    archive.writestr(name, data)
+
+            infos = archive.infolist()
+            needs_compaction = (
+                superseded_size(infos)
+                > sum(info.compress_size for info in infos) / 2
+            )
+
+        if needs_compaction:
+            logging.debug(f"Compacting archive {path}.")
+            compact(temp_path)
+
+        atomic_writer.sync_file(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        atomic_writer.remove_quietly(temp_path)
+        raise
+
+    atomic_writer.sync_directory(os.path.dirname(path) or os.curdir)
@@ -0,0 +1,47 @@
+"""Benchmark Cache.load, a no-op Cache.save and deleting a profile on a large
+database.
+
+Usage: python -m benchmarks.cache_load [PROFILES] [OUTPUTS] [DECKS]
+"""
+
+import sys
+
+import architrice
+
+from . import common
+
+
+def main(n_profiles=100, n_outputs=4, n_decks=1000):
+    directory = common.use_temporary_data_dir()
+    architrice.database.init()
+    n_deck_files = common.populate_profiles(
+        n_profiles, n_outputs, n_decks, directory
+    )
+    architrice.database.close()
+
+    print(
+        f"{n_profiles} profiles x {n_outputs} outputs x {n_decks} decks "
+        f"({n_deck_files} deck files)"
+    )
+    with common.timed("Cache.load", n_deck_files, "deck files"):
+        cache = architrice.caching.Cache.load()
+    assert len(cache.profiles) == n_profiles
+
+    # DeckFiles are loaded lazily, on first access per OutputDir.
+    with common.timed("Load deck files", n_deck_files, "deck files"):
+        for profile in cache.profiles:
+            for output in profile.outputs:
+                output.output_dir.deck_files
+
+    with common.timed("Cache.save (unchanged)", n_deck_files, "deck files"):
+        cache.save()
+
+    # Deleting a profile cascades to its outputs and their deck files.
+    architrice.database.init()
+    with common.timed("Delete profile", n_outputs * n_decks, "deck files"):
+        cache.remove_profile(cache.profiles[-1])
+        architrice.database.commit()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
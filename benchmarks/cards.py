@@ -0,0 +1,76 @@
+"""Benchmark the size of the card tables and the speed of card lookups, with
+and without the compiled card snapshot.
+
+Usage: python -m benchmarks.cards [NAMES] [LOOKUPS]
+"""
+
+import os
+import random
+import sys
+
+import architrice
+
+from . import common
+
+card_info = architrice.targets.card_info
+
+
+def card_json(n_names):
+    """Roughly the shape of Scryfall's default cards: ~3 printings per name,
+    spread over several hundred editions."""
+
+    cards = []
+    for i in range(n_names):
+        for j in range(1 + i % 5):
+            cards.append(
+                {
+                    "name": f"Benchmark Card Number {i}",
+                    "mtgo_id": (i * 5 + j) if j % 2 else None,
+                    "layout": "transform" if i % 20 == 0 else "normal",
+                    "collector_number": str((i + j) % 400),
+                    "set": f"s{(i + j * 97) % 700:03}",
+                    "reprint": j > 0,
+                }
+            )
+    return cards
+
+
+def main(n_names=27000, n_lookups=5000):
+    common.use_temporary_data_dir()
+    architrice.database.init()
+
+    cards = card_json(n_names)
+    with common.timed("save_card_info", len(cards), "printings"):
+        card_info.save_card_info(cards)
+    architrice.database.close()
+
+    size = os.path.getsize(architrice.database.database.file)
+    print(f"database size: {size / 1024 / 1024:.1f}MiB")
+
+    architrice.database.init()
+    names = random.Random(0).sample([card["name"] for card in cards], n_lookups)
+    card_info.find.cache_clear()
+    with common.timed("find (cold)", n_lookups, "lookups"):
+        for name in names:
+            card_info.find(name, update_if_necessary=False)
+
+    with common.timed("scan all printings", len(cards), "printings"):
+        for _ in architrice.database.execute(
+            card_info.SELECT_CARDS.format("LIKE ?"), ("%",)
+        ):
+            pass
+
+    with common.timed("rebuild_snapshot", n_names, "names"):
+        card_info.rebuild_snapshot()
+    size = os.path.getsize(card_info.snapshot_path())
+    print(f"snapshot size: {size / 1024 / 1024:.1f}MiB")
+
+    card_info.find.cache_clear()
+    with common.timed("find (cold, snapshot)", n_lookups, "lookups"):
+        for name in names:
+            card_info.find(name, update_if_necessary=False)
+    architrice.database.close()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,76 @@
+import contextlib
+import os
+import tempfile
+import time
+
+import architrice
+
+
+def use_temporary_data_dir():
+    """Point architrice at an empty data directory and return its path."""
+
+    directory = tempfile.mkdtemp()
+    architrice.utils.DATA_DIR = os.path.join(directory, "architrice")
+    return directory
+
+
+@contextlib.contextmanager
+def timed(label, n=None, unit="items"):
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+
+    message = f"{label}: {elapsed:.3f}s"
+    if n:
+        message += f" ({n / elapsed:.0f} {unit}/s)"
+    print(message)
+
+
+def populate_profiles(n_profiles, n_outputs, n_decks, directory):
+    """Insert n_profiles profiles, each with n_outputs outputs tracking
+    n_decks deck files, directly into the database."""
+
+    database = architrice.database
+    target_shorts = [t.SHORT for t in architrice.targets.targetlist]
+
+    users = []
+    profiles = []
+    output_dirs = []
+    outputs = []
+    decks = []
+    deck_files = []
+    for p in range(1, n_profiles + 1):
+        users.append((p, f"user{p}", "A"))
+        profiles.append((p, p, f"profile{p}"))
+        output_dirs.append((p, os.path.join(directory, f"decks{p}")))
+
+        for o in range(n_outputs):
+            output_id = (p - 1) * n_outputs + o + 1
+            outputs.append(
+                (output_id, target_shorts[o % len(target_shorts)], p, p, 1)
+            )
+
+        for d in range(n_decks):
+            deck_db_id = (p - 1) * n_decks + d + 1
+            decks.append((deck_db_id, f"{p}-{d}", "A"))
+            for o in range(n_outputs):
+                output_id = (p - 1) * n_outputs + o + 1
+                deck_files.append(
+                    (deck_db_id, f"deck_{d}.{o}", output_id, 1000)
+                )
+
+    database.insert_many_tuples("users", ["id", "name", "source"], users)
+    database.insert_many_tuples("profiles", ["id", "user", "name"], profiles)
+    database.insert_many_tuples("output_dirs", ["id", "path"], output_dirs)
+    database.insert_many_tuples(
+        "outputs",
+        ["id", "target", "output_dir", "profile", "include_maybe"],
+        outputs,
+    )
+    database.insert_many_tuples("decks", ["id", "deck_id", "source"], decks)
+    database.insert_many_tuples(
+        "deck_files", ["deck", "file_name", "output", "updated"], deck_files
+    )
+    database.commit()
+
+    return len(deck_files)
@@ -0,0 +1,79 @@
+"""Benchmark database writes with SQLite's default connection settings against
+Database.DEFAULT_PRAGMAS.
+
+Usage: python -m benchmarks.database [CARDS] [DECK_FILES]
+"""
+
+import os
+import sys
+
+import architrice
+
+from . import common
+
+
+def card_json(n):
+    return [
+        {
+            "name": f"Card {i}",
+            "mtgo_id": i,
+            "layout": "normal",
+            "collector_number": str(i % 300),
+            "set": f"s{i % 500}",
+            "reprint": i % 3 == 0,
+        }
+        for i in range(n)
+    ]
+
+
+def run(label, pragmas, n_cards, n_deck_files):
+    print(f"{label}:")
+
+    directory = common.use_temporary_data_dir()
+    architrice.database.init(pragmas)
+
+    cards = card_json(n_cards)
+    with common.timed("  save_card_info", n_cards, "cards"):
+        architrice.targets.card_info.save_card_info(cards)
+
+    common.populate_profiles(1, 1, 0, directory)
+    architrice.database.close()
+    cache = architrice.caching.Cache.load()
+    output = cache.profiles[0].outputs[0]
+    for i in range(n_deck_files):
+        output.get_updated_deck_file(
+            architrice.deckreprs.Deck(str(i), "A", f"Deck {i}", "")
+        )
+
+    with common.timed("  Cache.save (insert)", n_deck_files, "deck files"):
+        cache.save()
+
+    # Many small committed transactions, as when several profiles are synced
+    # by separate runs.
+    cache = architrice.caching.Cache.load()
+    deck_files = list(
+        cache.profiles[0].outputs[0].output_dir.deck_files.values()
+    )
+    with common.timed("  commit per update", n_deck_files // 10, "commits"):
+        for deck_file in deck_files[: n_deck_files // 10]:
+            deck_file.update()
+            deck_file.store()
+            architrice.database.commit()
+    architrice.database.close()
+
+    size = os.path.getsize(architrice.database.database.file)
+    print(f"  database size: {size / 1024 / 1024:.1f}MiB")
+
+
+def main(n_cards=80000, n_deck_files=10000):
+    run("SQLite defaults", {}, n_cards, n_deck_files)
+    run(
+        "Database.DEFAULT_PRAGMAS",
+        architrice.database.Database.DEFAULT_PRAGMAS,
+        n_cards,
+        n_deck_files,
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""Benchmark the memory used by decks and deck files held in memory.
+
+Measures the memory allocated by Cache.load and loading the deck files of a
+database with DECKS decks, and by DECKS downloaded decks of CARDS cards each.
+
+Usage: python -m benchmarks.memory [DECKS] [CARDS]
+"""
+
+import sys
+import tracemalloc
+
+import architrice
+
+from . import common
+
+
+def measure(label, n, function):
+    tracemalloc.start()
+    result = function()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label}: {current / 2 ** 20:.1f} MiB ({current / n:.0f} B each)")
+    return result
+
+
+def load_cache():
+    cache = architrice.caching.Cache.load()
+    for profile in cache.profiles:
+        for output in profile.outputs:
+            output.output_dir.deck_files
+    return cache
+
+
+def download_decks(n_decks, n_cards):
+    # Sources build a fresh string for each card name in each deck, as if
+    # parsed from a response.
+    decks = []
+    for i in range(n_decks):
+        deck = architrice.deckreprs.Deck(str(i), "A", f"Deck {i}", "")
+        deck.add_cards(
+            [(1, "".join(["Card ", str(j)])) for j in range(n_cards)], "main"
+        )
+        decks.append(deck)
+    return decks
+
+
+def main(n_decks=10000, n_cards=100):
+    directory = common.use_temporary_data_dir()
+    architrice.database.init()
+    n_deck_files = common.populate_profiles(10, 1, n_decks // 10, directory)
+    architrice.database.close()
+
+    cache = measure("Cache.load", n_deck_files, load_cache)
+    decks = measure(
+        f"Decks of {n_cards} cards",
+        n_decks,
+        lambda: download_decks(n_decks, n_cards),
+    )
+
+    # Keep the results alive until both have been measured.
+    return cache, decks
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
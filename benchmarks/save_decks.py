@@ -0,0 +1,52 @@
+"""Benchmark Profile.save_decks writing a batch of decks to an output for
+each target.
+
+Usage: python -m benchmarks.save_decks [DECKS] [CARDS]
+"""
+
+import os
+import sys
+
+import architrice
+
+from . import common
+from . import targets
+
+
+def main(n_decks=500, n_cards=100):
+    directory = common.use_temporary_data_dir()
+    architrice.database.init()
+
+    # Card info is looked up for each target, so put it in the database.
+    architrice.targets.card_info.insert_card_tuples(
+        [
+            (
+                name,
+                card.mtgo_id,
+                card.is_dfc,
+                card.collector_number,
+                card.edition,
+                0,
+            )
+            for name, card in targets.card_info_map(n_cards).items()
+        ]
+    )
+
+    cache = architrice.caching.Cache()
+    profile = cache.build_profile(architrice.sources.get("A"), "user")
+    for target in architrice.targets.get_all():
+        cache.build_output(
+            profile, target, os.path.join(directory, target.short), False
+        )
+    decks = [targets.deck(i, n_cards) for i in range(n_decks)]
+
+    n_files = n_decks * len(profile.outputs)
+    print(f"{len(profile.outputs)} outputs x {n_decks} decks x {n_cards} cards")
+    with common.timed("Profile.save_decks", n_files, "deck files"):
+        profile.save_decks(decks)
+
+    architrice.database.close()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
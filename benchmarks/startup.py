@@ -0,0 +1,64 @@
+"""Benchmark the startup time of short running architrice commands.
+
+Runs each command RUNS times in a fresh interpreter against a database with
+PROFILES profiles, printing the median wall time and the median time taken to
+import architrice, as reported by -X importtime.
+
+Usage: python -m benchmarks.startup [RUNS] [PROFILES]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import architrice
+
+from . import common
+
+COMMANDS = [["-v"], ["-j"]]
+
+
+def import_time(stderr):
+    # -X importtime writes "import time: self | cumulative | name" lines, the
+    # cumulative time of the architrice package covers everything it imports.
+    for line in stderr.splitlines():
+        if line.startswith("import time:"):
+            _, cumulative, name = line.split("|")
+            if name.strip() == "architrice":
+                return int(cumulative) / 1e6
+    return 0
+
+
+def run(command, env):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "architrice", "-q", "-i"]
+        + command,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, import_time(result.stderr)
+
+
+def main(n_runs=10, n_profiles=10):
+    directory = common.use_temporary_data_dir()
+    architrice.database.init()
+    common.populate_profiles(n_profiles, 1, 100, directory)
+    architrice.database.close()
+
+    env = dict(os.environ, XDG_DATA_HOME=directory)
+    for command in COMMANDS:
+        times, import_times = zip(*(run(command, env) for _ in range(n_runs)))
+        print(
+            f"architrice {' '.join(command)}: "
+            f"{statistics.median(times):.3f}s "
+            f"(imports {statistics.median(import_times):.3f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
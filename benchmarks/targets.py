@@ -0,0 +1,66 @@
+"""Benchmark writing deck files for each target.
+
+Usage: python -m benchmarks.targets [DECKS] [CARDS]
+
+Without arguments, runs a batch of 1000 100 card decks and a batch of 1000
+540 card cubes.
+"""
+
+import os
+import sys
+import tempfile
+
+import architrice
+
+from . import common
+
+
+def card_info_map(n_cards):
+    return {
+        f"Card {i}": architrice.deckreprs.Card(
+            f"Card {i}", str(i + 1), i % 20 == 0, str(i % 300), f"s{i % 50:02}"
+        )
+        for i in range(n_cards)
+    }
+
+
+def deck(i, n_cards):
+    side = n_cards // 10
+    return architrice.deckreprs.Deck(
+        str(i),
+        "A",
+        f"Deck {i}",
+        "A deck & its <description>.",
+        main=[(1 + j % 4, f"Card {j}") for j in range(n_cards - side)],
+        side=[(1, f"Card {j}") for j in range(n_cards - side, n_cards)],
+    )
+
+
+def run(n_decks, n_cards):
+    directory = tempfile.mkdtemp()
+    cards = card_info_map(n_cards)
+    decks = [deck(i, n_cards) for i in range(n_decks)]
+
+    print(f"{n_decks} decks x {n_cards} cards")
+    for target in architrice.targets.get_all():
+        deck_tuples = [
+            (d, os.path.join(directory, target.create_file_name(d.name)))
+            for d in decks
+        ]
+        with common.timed(f"{target.name}", n_decks, "decks"):
+            target.save_decks(deck_tuples, card_info_map=cards)
+        with common.timed(f"{target.name} (render)", n_decks, "decks"):
+            for d in decks:
+                target.render_deck(d, card_info_map=cards)
+
+
+def main(n_decks=None, n_cards=None):
+    if n_decks is None:
+        run(1000, 100)
+        run(1000, 540)
+    else:
+        run(n_decks, n_cards or 100)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -1 +1,6 @@
+from .test_caching import TestCacheSave, TestOutputDir
+from .test_card_info import TestCardListExport, TestCardSnapshot
+from .test_database import TestDatabase
+from .test_deckreprs import TestDeck
 from .test_integration import TestIntegration
+from .test_targets import TestTargets
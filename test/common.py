@@ -0,0 +1,26 @@
+import os
+import tempfile
+import unittest
+
+import architrice
+
+
+class DataDirTestCase(unittest.TestCase):
+    """A test case which runs architrice with an empty data directory."""
+
+    # Whether setUp should connect to the database in the new directory.
+    INIT_DATABASE = True
+
+    def setUp(self):
+        self._data_dir = architrice.utils.DATA_DIR
+        self.use_new_data_dir()
+
+    def tearDown(self):
+        architrice.database.close()
+        architrice.utils.DATA_DIR = self._data_dir
+
+    def use_new_data_dir(self):
+        self.directory = tempfile.mkdtemp()
+        architrice.utils.DATA_DIR = os.path.join(self.directory, "architrice")
+        if self.INIT_DATABASE:
+            architrice.database.init()
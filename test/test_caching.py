@@ -0,0 +1,265 @@
+import os
+import tempfile
+import unittest
+import zipfile
+
+import architrice
+
+from . import common
+
+
+class TestOutputDir(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output_dir = architrice.caching.OutputDir(self.directory)
+        self.output = architrice.caching.Output(
+            architrice.targets.get("Generic"), self.output_dir
+        )
+
+    def deck(self, deck_id, name="Test Deck"):
+        return architrice.deckreprs.Deck(deck_id, "A", name, "")
+
+    def deck_update(self, deck, updated):
+        return architrice.deckreprs.DeckUpdate(deck, updated)
+
+    def testDeckNeedsUpdatingUsesSnapshot(self):
+        deck = self.deck("1")
+        deck_file = self.output_dir.get_deck_file(self.output, deck)
+        deck_file.updated = 10
+
+        with open(os.path.join(self.directory, deck_file.file_name), "w"):
+            pass
+
+        self.assertFalse(
+            self.output.deck_needs_updating(self.deck_update(deck, 5))
+        )
+        self.assertTrue(
+            self.output.deck_needs_updating(self.deck_update(deck, 20))
+        )
+
+        # Deleting the file after the snapshot is taken isn't noticed until
+        # the directory is scanned again.
+        os.remove(os.path.join(self.directory, deck_file.file_name))
+        self.assertFalse(
+            self.output.deck_needs_updating(self.deck_update(deck, 5))
+        )
+        self.output_dir.scan()
+        self.assertTrue(
+            self.output.deck_needs_updating(self.deck_update(deck, 5))
+        )
+
+    def testFileWrittenUpdatesSnapshot(self):
+        self.assertFalse(self.output_dir.file_exists("deck.txt"))
+        with open(os.path.join(self.directory, "deck.txt"), "w"):
+            pass
+        self.output_dir.file_written("deck.txt")
+        self.assertTrue(self.output_dir.file_exists("deck.txt"))
+
+    def testCreateFileNameSuffixes(self):
+        file_names = [
+            self.output_dir.get_deck_file(
+                self.output, self.deck(str(i), "Untitled")
+            ).file_name
+            for i in range(4)
+        ]
+        self.assertEqual(
+            file_names,
+            [
+                "untitled.txt",
+                "untitled_1.txt",
+                "untitled_2.txt",
+                "untitled_3.txt",
+            ],
+        )
+
+        # A deck whose own name collides with an allocated suffix.
+        self.assertEqual(
+            self.output_dir.get_deck_file(
+                self.output, self.deck("4", "Untitled 1")
+            ).file_name,
+            "untitled_1_1.txt",
+        )
+
+        self.output_dir.remove_output(self.output)
+        self.assertEqual(
+            self.output_dir.get_deck_file(
+                self.output, self.deck("5", "Untitled")
+            ).file_name,
+            "untitled.txt",
+        )
+
+    def testReplacedDeckFileFreesName(self):
+        for i in range(2):
+            self.output_dir.get_deck_file(self.output, self.deck(str(i), "A"))
+
+        self.output_dir.add_deck_file(
+            self.output,
+            architrice.caching.DeckFile(
+                self.deck("1", "B"), 0, "b.txt", self.output
+            ),
+        )
+        self.assertEqual(
+            self.output_dir.get_deck_file(
+                self.output, self.deck("2", "A")
+            ).file_name,
+            "a_1.txt",
+        )
+
+    def testFailedWriteLeavesDeckFileOutdated(self):
+        writes = [
+            architrice.caching.DeckFileWrite(
+                self.output,
+                deck,
+                self.output_dir.get_deck_file(self.output, deck),
+                {},
+            )
+            for deck in [self.deck(str(i), f"Deck {i}") for i in range(20)]
+        ]
+        writes[5].deck_file.file_name = os.path.join("missing", "deck.txt")
+
+        with self.assertRaises(FileNotFoundError):
+            architrice.caching.write_deck_files(writes)
+
+        for i, write in enumerate(writes):
+            self.assertEqual(write.deck_file.updated > 0, i != 5)
+            self.assertEqual(
+                self.output_dir.file_exists(write.deck_file.file_name), i != 5
+            )
+        self.assertEqual(len(os.listdir(self.directory)), 19)
+
+    def testArchiveReplacesChangedDecks(self):
+        target = architrice.targets.get("Cockatrice")
+        output = architrice.caching.Output(
+            target, self.output_dir, archive=True
+        )
+        decks = [self.deck(str(i), f"Deck {i}") for i in range(3)]
+        output.save_decks(decks)
+        for i in range(10):
+            decks[0].description = f"Version {i}"
+            output.save_decks(decks[:1])
+
+        file_names = [
+            self.output_dir.get_deck_file(output, deck).file_name
+            for deck in decks
+        ]
+        with zipfile.ZipFile(output.archive_path) as archive:
+            self.assertEqual(set(archive.namelist()), set(file_names))
+            self.assertEqual(
+                archive.read(file_names[0]), target.render_deck(decks[0])
+            )
+            # Superseded members are dropped as the archive is compacted.
+            self.assertLess(len(archive.infolist()), 10)
+
+        self.assertEqual(os.listdir(self.directory), ["cockatrice.zip"])
+        output.archive_members = None
+        self.assertTrue(all(output.file_exists(f) for f in file_names))
+
+
+class TestCacheSave(common.DataDirTestCase):
+    # Cache.load connects to the database.
+    INIT_DATABASE = False
+
+    def setUp(self):
+        super().setUp()
+
+        cache = self.load()
+        profile = cache.build_profile(
+            architrice.sources.get("Moxfield"), "Test"
+        )
+        cache.build_output(
+            profile,
+            architrice.targets.get("Generic"),
+            os.path.join(self.directory, "out"),
+            False,
+        )
+        for i in range(3):
+            deck = architrice.deckreprs.Deck(str(i), "M", f"Deck {i}", "")
+            profile.outputs[0].get_updated_deck_file(deck)
+        cache.save()
+
+    def load(self):
+        # Users and OutputDirs are kept in class level maps, clear them to
+        # simulate a fresh run.
+        architrice.caching.User.users.clear()
+        architrice.caching.OutputDir.output_dirs.clear()
+        return architrice.caching.Cache.load()
+
+    def testDeckFilesLoadLazily(self):
+        cache = self.load()
+        output_dir = cache.profiles[0].outputs[0].output_dir
+        self.assertEqual(list(output_dir.loaded_deck_files()), [])
+        self.assertEqual(len(output_dir.deck_files), 3)
+        self.assertFalse(output_dir.pending_outputs)
+        cache.save()
+
+    def testOutputsShareFileNames(self):
+        cache = self.load()
+        profile = cache.profiles[0]
+        existing = {
+            deck_file._id
+            for deck_file in profile.outputs[0].output_dir.deck_files.values()
+        }
+        cache.build_output(
+            profile,
+            architrice.targets.get("Generic"),
+            os.path.join(self.directory, "other"),
+            False,
+        )
+        output = profile.outputs[1]
+        deck_files = [
+            output.get_updated_deck_file(
+                architrice.deckreprs.Deck(str(i), "M", f"Deck {i}", "")
+            )
+            for i in range(3)
+        ]
+
+        architrice.database.enable_profiling()
+        try:
+            cache.save()
+            statements = architrice.database.database.stats.statements
+        finally:
+            architrice.database.database.stats = None
+
+        self.assertTrue(all(deck_file._id for deck_file in deck_files))
+        self.assertFalse(existing & {deck_file._id for deck_file in deck_files})
+
+        # Only the rows of the new output's deck files are selected, not those
+        # of the other output with the same file names.
+        stats = statements[
+            "SELECT id, file_name, output FROM deck_files "
+            "WHERE file_name IN (?, ...) AND output IN (?, ...);"
+        ]
+        self.assertEqual(stats.rows, 3)
+
+    def testLoadedObjectsAreClean(self):
+        cache = self.load()
+        self.assertTrue(
+            all(not o.dirty for o in cache.stored_objects()),
+            "Objects loaded from the database should be clean.",
+        )
+
+        deck_file = next(
+            iter(cache.profiles[0].outputs[0].output_dir.deck_files.values())
+        )
+        deck_file.updated = 1
+        self.assertTrue(deck_file.dirty)
+        self.assertEqual(
+            [o for o in cache.stored_objects() if o.dirty], [deck_file]
+        )
+
+        cache.save()
+        cache = self.load()
+        self.assertIn(
+            1,
+            [
+                d.updated
+                for d in cache.profiles[0]
+                .outputs[0]
+                .output_dir.deck_files.values()
+            ],
+        )
+        cache.save()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import os
+import threading
+import unittest
+import unittest.mock
+
+import architrice
+
+from . import common
+
+card_info = architrice.targets.card_info
+database = architrice.database
+
+
+class TestCardSnapshot(common.DataDirTestCase):
+    CARDS = [
+        # (name, mtgo_id, is_dfc, collector_number, edition, reprint)
+        ("Snapshot Card", None, False, "1", "abc", False),
+        ("Snapshot Card", 12, False, "20", "def", True),
+        ("Snapshot Card", 34, False, "3", "ghi", True),
+        ("Paper Card", None, True, "4", "abc", False),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        card_info.insert_card_tuples(TestCardSnapshot.CARDS)
+        card_info.find.cache_clear()
+
+    def tearDown(self):
+        card_info.remove_snapshot()
+        card_info.find.cache_clear()
+        super().tearDown()
+
+    def find_all(self):
+        card_info.find.cache_clear()
+        return [
+            repr(
+                card_info.find(
+                    name,
+                    mtgo_id_required=mtgo_id_required,
+                    update_if_necessary=False,
+                )
+            )
+            for name in ["Snapshot Card", "Paper Card"]
+            for mtgo_id_required in [False, True]
+        ]
+
+    def testSnapshotMatchesDatabase(self):
+        expected = self.find_all()
+
+        card_info.rebuild_snapshot()
+        database.enable_profiling()
+        try:
+            self.assertEqual(self.find_all(), expected)
+            statements = database.database.stats.statements
+        finally:
+            database.database.stats = None
+
+        # Only the lookup the snapshot can't answer, for an MTGO printing of
+        # Paper Card, reaches the database.
+        self.assertEqual(sum(stats.count for stats in statements.values()), 1)
+
+    def testSnapshotChoosesDatabasePrinting(self):
+        # Several original printings, in editions whose codes are in a
+        # different order to the order they're inserted in.
+        card_info.insert_card_tuples(
+            [
+                ("Many Printings", 10 + i, False, str(i), edition, False)
+                for i, edition in enumerate(["zzz", "mmm", "aaa", "nnn"])
+            ]
+        )
+
+        def find():
+            card_info.find.cache_clear()
+            return [
+                repr(
+                    card_info.find(
+                        "Many Printings",
+                        mtgo_id_required=mtgo_id_required,
+                        update_if_necessary=False,
+                    )
+                )
+                for mtgo_id_required in [False, True]
+            ]
+
+        expected = find()
+        card_info.rebuild_snapshot()
+        self.assertEqual(find(), expected)
+
+    def testMissingNamesFallBackToDatabase(self):
+        card_info.rebuild_snapshot()
+        card_info.insert_card_tuples([("New Card", 5, False, "5", "jkl", 0)])
+
+        card = card_info.find("New Card", update_if_necessary=False)
+        self.assertEqual((card.mtgo_id, card.edition), ("5", "jkl"))
+
+    def testInsertFromWorkerThread(self):
+        # Cards are resolved, and new cards inserted, by the threads which
+        # download decks.
+        errors = []
+
+        def insert():
+            try:
+                card_info.insert_card_tuples(
+                    [("Worker Card", 6, False, "6", "mno", 0)]
+                )
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=insert)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(errors, [])
+        card = card_info.find("Worker Card", update_if_necessary=False)
+        self.assertEqual((card.mtgo_id, card.edition), ("6", "mno"))
+
+    def testUnchangedCardListIsRecorded(self):
+        database.upsert(
+            "database_events",
+            id=database.DatabaseEvents.CARD_LIST_UPDATE.value,
+            time=0,
+            data="https://example.com/cards.json",
+        )
+        database.commit()
+
+        response = unittest.mock.Mock()
+        response.json.return_value = {
+            "download_uri": "https://example.com/cards.json"
+        }
+        with unittest.mock.patch("requests.get", return_value=response) as get:
+            # Each check runs on its own thread, as when resolving the cards
+            # of downloaded decks.
+            for _ in range(3):
+                thread = threading.Thread(target=card_info.update_card_list)
+                thread.start()
+                thread.join()
+
+        self.assertEqual(get.call_count, 1)
+
+
+class TestCardListExport(common.DataDirTestCase):
+    def tearDown(self):
+        card_info.remove_snapshot()
+        card_info.find.cache_clear()
+        super().tearDown()
+
+    def testRoundTrip(self):
+        card_info.insert_card_tuples(TestCardSnapshot.CARDS)
+        database.upsert(
+            "database_events",
+            id=database.DatabaseEvents.CARD_LIST_UPDATE.value,
+            time=100,
+            data="https://example.com/cards.json",
+        )
+        path = os.path.join(self.directory, "cards.json.gz")
+        self.assertEqual(card_info.export_card_list(path), 4)
+        database.close()
+
+        self.use_new_data_dir()
+        self.assertEqual(card_info.import_card_list(path), 4)
+
+        self.assertEqual(
+            set(
+                database.execute(
+                    card_info.SELECT_CARDS.format("LIKE ?"), ("%",)
+                )
+            ),
+            {
+                (name, mtgo_id, int(is_dfc), cn, edition, int(reprint))
+                for name, mtgo_id, is_dfc, cn, edition, reprint in (
+                    TestCardSnapshot.CARDS
+                )
+            },
+        )
+        self.assertEqual(
+            database.select_one(
+                "database_events",
+                ["time", "data"],
+                id=database.DatabaseEvents.CARD_LIST_UPDATE.value,
+            ),
+            (100, "https://example.com/cards.json"),
+        )
+        self.assertTrue(os.path.exists(card_info.snapshot_path()))
+
+
+if __name__ == "__main__":
+    unittest.main()
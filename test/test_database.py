@@ -0,0 +1,232 @@
+import concurrent.futures
+import threading
+import unittest
+
+import architrice
+
+from . import common
+
+database = architrice.database
+
+
+class TestDatabase(common.DataDirTestCase):
+    def testThreadsReadOnOwnConnections(self):
+        database.insert("output_dirs", path="committed")
+        database.commit()
+        database.insert("output_dirs", path="uncommitted")
+
+        results = []
+
+        def read():
+            results.append(database.database.reader() is database.database.conn)
+            results.append(
+                sorted(path for path, in database.select("output_dirs", "path"))
+            )
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+
+        # The writer's uncommitted insert isn't visible to other threads.
+        self.assertEqual(results, [False, ["committed"]])
+        self.assertEqual(
+            sorted(path for path, in database.select("output_dirs", "path")),
+            ["committed", "uncommitted"],
+        )
+
+    def testReadersOfFinishedPoolsAreClosed(self):
+        def read(_):
+            return list(database.select("output_dirs"))
+
+        for _ in range(5):
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=4
+            ) as executor:
+                list(executor.map(read, range(16)))
+            self.assertLessEqual(len(database.database.readers), 4)
+
+        database.close_finished_readers()
+        self.assertEqual(database.database.readers, [])
+
+    def testTransactionRollsBack(self):
+        with self.assertRaises(RuntimeError):
+            with database.transaction():
+                database.insert("output_dirs", path="rolled back")
+                raise RuntimeError()
+
+        self.assertIsNone(
+            database.select_one("output_dirs", path="rolled back")
+        )
+
+    def testSelectWhereInChunks(self):
+        n = database.Database.MAX_VARIABLES * 2 + 1
+        database.insert_many_tuples(
+            "output_dirs", ["path"], [(str(i),) for i in range(n)]
+        )
+
+        self.assertEqual(
+            len(
+                database.select_where_in(
+                    "output_dirs", "path", map(str, range(n))
+                )
+            ),
+            n,
+        )
+
+    def testStoreManySetsIds(self):
+        def output_dirs():
+            return [
+                architrice.caching.OutputDir(str(i))
+                for i in range(database.Database.MAX_VARIABLES + 1)
+            ]
+
+        stored = output_dirs()
+        database.store_many(stored)
+        self.assertEqual(
+            {(o._id, o.path) for o in stored},
+            set(database.select("output_dirs", ["id", "path"])),
+        )
+        self.assertFalse(any(o.dirty for o in stored))
+
+        # Objects with existing keys resolve to the existing rows.
+        restored = output_dirs()
+        database.store_many(restored)
+        self.assertEqual([o._id for o in stored], [o._id for o in restored])
+
+    def read_database_file(self):
+        with open(database.database.file, "rb") as f:
+            return f.read()
+
+    def testInitRegistersOnlyWhenChanged(self):
+        database.close()
+        contents = self.read_database_file()
+        database.init()
+        self.assertEqual(database.database.conn.total_changes, 0)
+        database.close()
+        self.assertEqual(self.read_database_file(), contents)
+
+        database.init()
+
+        database.delete("targets", short="G")
+        database.upsert("string_values", key=database.REGISTRY_KEY, value="")
+        database.commit()
+        database.close()
+
+        database.init()
+        self.assertIsNotNone(database.select_one("targets", short="G"))
+
+    def query_plan(self, command, *args):
+        return " ".join(
+            tup[3]
+            for tup in database.execute("EXPLAIN QUERY PLAN " + command, args)
+        )
+
+    def testHotQueriesUseIndexes(self):
+        # Deck files loaded by Cache.load for a set of outputs.
+        self.assertIn(
+            "USING INDEX idx_deck_files_output",
+            self.query_plan(
+                "SELECT df.id, d.deck_id FROM deck_files df "
+                "JOIN decks d ON df.deck = d.id WHERE df.output IN (?, ?);",
+                1,
+                2,
+            ),
+        )
+
+        # Lookups made by the ON DELETE CASCADE of each foreign key.
+        for table, column in [
+            ("deck_files", "output"),
+            ("deck_files", "deck"),
+            ("outputs", "profile"),
+            ("outputs", "output_dir"),
+        ]:
+            self.assertIn(
+                f"USING COVERING INDEX idx_{table}_{column}",
+                self.query_plan(
+                    f"SELECT 1 FROM {table} WHERE {column} = ?;", 1
+                ),
+            )
+
+    def create_version_3_tables(self):
+        database.execute("ALTER TABLE outputs DROP COLUMN archive;")
+        for table in ["printings", "card_names", "editions"]:
+            database.execute(f"DROP TABLE {table};")
+        database.execute(
+            "CREATE TABLE cards (id INTEGER PRIMARY KEY, name TEXT, "
+            "mtgo_id INTEGER UNIQUE, is_dfc INTEGER NOT NULL, "
+            "collector_number TEXT NOT NULL, edition TEXT NOT NULL, "
+            "reprint INTEGER NOT NULL);"
+        )
+
+    def testMigrationCreatesIndexes(self):
+        self.create_version_3_tables()
+        for (name,) in list(
+            database.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND name LIKE 'idx_%';"
+            )
+        ):
+            database.execute(f"DROP INDEX {name};")
+        database.execute("PRAGMA user_version = 2;")
+        database.close()
+
+        database.init()
+        self.assertIn(
+            "idx_deck_files_output",
+            [
+                name
+                for name, in database.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index';"
+                )
+            ],
+        )
+        self.assertEqual(
+            list(database.execute("PRAGMA user_version;"))[0][0],
+            database.Database.USER_VERSION,
+        )
+
+    def testMigrationMovesCards(self):
+        self.create_version_3_tables()
+        database.database.conn.executemany(
+            "INSERT INTO cards (name, mtgo_id, is_dfc, collector_number, "
+            "edition, reprint) VALUES (?, ?, ?, ?, ?, ?);",
+            [
+                ("Migrated Card", None, 0, "1", "abc", 0),
+                ("Migrated Card", 123, 0, "2", "def", 1),
+            ],
+        )
+        database.execute("PRAGMA user_version = 3;")
+        database.commit()
+        database.close()
+
+        database.init()
+        card = architrice.targets.card_info.find(
+            "Migrated Card", mtgo_id_required=True, update_if_necessary=False
+        )
+        self.assertEqual(
+            (card.mtgo_id, card.collector_number, card.edition),
+            ("123", "2", "def"),
+        )
+        self.assertEqual(len(list(database.select("printings"))), 2)
+        self.assertEqual(len(list(database.select("card_names"))), 1)
+
+    def testProfilingGroupsStatementShapes(self):
+        database.enable_profiling()
+        try:
+            database.insert_many_tuples(
+                "output_dirs", ["path"], [("a",), ("b",), ("c",)]
+            )
+            database.select_where_in("output_dirs", "path", ["a"])
+            database.select_where_in("output_dirs", "path", ["a", "b", "c"])
+            statements = database.database.stats.statements
+        finally:
+            database.database.stats = None
+
+        stats = statements["SELECT * FROM output_dirs WHERE path IN (?, ...);"]
+        self.assertEqual((stats.count, stats.rows), (2, 4))
+        stats = statements["INSERT INTO output_dirs (path) VALUES (?, ...);"]
+        self.assertEqual((stats.count, stats.rows), (1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
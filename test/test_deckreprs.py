@@ -0,0 +1,49 @@
+import unittest
+
+import architrice
+
+Deck = architrice.deckreprs.Deck
+
+
+class TestDeck(unittest.TestCase):
+    def testDecksShareCards(self):
+        # Names built at runtime, as when parsed from a response.
+        first = Deck(
+            "1", "A", "First", "", main=[(1, "".join(["Sol", " Ring"]))]
+        )
+        second = Deck("2", "A", "Second", "")
+        second.add_cards([(1, " ".join(["Sol", "Ring"]))], "side")
+
+        self.assertIs(first.main[0], second.side[0])
+        self.assertFalse(hasattr(first, "__dict__"))
+
+    def testViewsAreCachedUntilCardsAdded(self):
+        deck = Deck(
+            "1",
+            "A",
+            "Deck",
+            "",
+            main=[(1, "Sol Ring"), (1, "Island")],
+            commanders=[(1, "Braids, Arisen Nightmare")],
+        )
+
+        main = deck.get_main_deck(include_commanders=True)
+        self.assertEqual(
+            [name for _, name in main],
+            ["Braids, Arisen Nightmare", "Island", "Sol Ring"],
+        )
+        self.assertIs(deck.get_main_deck(include_commanders=True), main)
+        self.assertEqual(len(deck.main), 2)
+
+        names = deck.get_all_card_names()
+        deck.add_card((1, "Arcane Signet"), "side")
+        self.assertNotIn("Arcane Signet", names)
+        self.assertIn("Arcane Signet", deck.get_all_card_names())
+        self.assertEqual(
+            deck.get_sideboard(include_commanders=False),
+            ((1, "Arcane Signet"),),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
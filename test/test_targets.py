@@ -0,0 +1,164 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as et
+import zipfile
+
+import architrice
+
+from . import common
+
+Card = architrice.deckreprs.Card
+
+
+class TestTargets(unittest.TestCase):
+    TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+    # The deck and card info which the test sources produce, as in
+    # test_integration.
+    CARD_INFO_MAP = {
+        "Bala Ged Recovery // Bala Ged Sanctuary": Card(
+            "Bala Ged Recovery // Bala Ged Sanctuary", "83343", 1, "180", "znr"
+        ),
+        "Life // Death": Card("Life // Death", "46099", 0, "77", "ddj"),
+        "Sol Ring": Card("Sol Ring", "89631", 0, "263", "c21"),
+        "Blex, Vexing Pest // Search for Blex": Card(
+            "Blex, Vexing Pest // Search for Blex", "88777", 1, "148", "stx"
+        ),
+    }
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def deck(self):
+        return architrice.deckreprs.Deck(
+            "1",
+            "A",
+            "Test Deck",
+            "",
+            main=[
+                (1, "Sol Ring"),
+                (1, "Bala Ged Recovery // Bala Ged Sanctuary"),
+                (1, "Life // Death"),
+            ],
+            side=[(1, "Blex, Vexing Pest // Search for Blex")],
+        )
+
+    def save_deck(self, target, deck, card_info_map):
+        path = os.path.join(self.directory, target.create_file_name(deck.name))
+        target.save_deck(deck, path, card_info_map=card_info_map)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def testMatchesTestData(self):
+        for short in ["C", "G", "M", "X"]:
+            target = architrice.targets.get(short)
+            with open(
+                os.path.join(TestTargets.TEST_DATA_DIR, short, "test_deck")
+                + target.file_extension,
+                "rb",
+            ) as f:
+                expected = f.read()
+
+            self.assertEqual(
+                self.save_deck(target, self.deck(), TestTargets.CARD_INFO_MAP),
+                expected,
+                f"Bad deck file for target {short}.",
+            )
+
+    def testFailedWriteKeepsExistingFile(self):
+        target = architrice.targets.get("G")
+        deck = self.deck()
+        path = os.path.join(self.directory, target.create_file_name(deck.name))
+        expected = self.save_deck(target, deck, TestTargets.CARD_INFO_MAP)
+
+        # Generic needs card info for every card, so this fails part way.
+        with self.assertRaises(KeyError):
+            target.save_deck(deck, path, card_info_map={})
+
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), expected)
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(path)])
+
+    def testFailedArchiveUpdateKeepsArchive(self):
+        path = os.path.join(self.directory, "decks.zip")
+        architrice.targets.zip_archive.update(path, {"a.txt": b"a"})
+
+        # A member which can't be written fails the update part way.
+        with self.assertRaises(TypeError):
+            architrice.targets.zip_archive.update(
+                path, {"b.txt": b"b", "c.txt": None}
+            )
+
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.namelist(), ["a.txt"])
+        self.assertEqual(os.listdir(self.directory), ["decks.zip"])
+
+    def testCardFragmentsFollowCardInfo(self):
+        target = architrice.targets.get("X")
+        deck = architrice.deckreprs.Deck("1", "A", "Deck", "")
+        deck.add_card((1, "Sol Ring"), "main")
+
+        for edition in ["c21", "lea"]:
+            card_info_map = {"Sol Ring": Card("Sol Ring", "1", 0, "1", edition)}
+            self.assertEqual(
+                target.render_deck(deck, card_info_map=card_info_map),
+                f"1 [{edition.upper()}:1] Sol Ring{os.linesep}".encode(),
+            )
+
+    def testMtgoLogsEachMissingCard(self):
+        target = architrice.targets.get("M")
+        deck = architrice.deckreprs.Deck("1", "A", "Deck", "")
+        deck.add_card((1, "Paper Card"), "main")
+
+        for _ in range(2):
+            with self.assertLogs(level="INFO") as logs:
+                target.render_deck(deck, card_info_map={"Paper Card": None})
+            self.assertIn(
+                "Couldn't find MTGO data for Paper Card", logs.output[0]
+            )
+
+    def testXmlMatchesElementTree(self):
+        name = 'Fire & "Ice" <\r\n\t>'
+        deck = architrice.deckreprs.Deck(
+            "1", "A", "<Deck & Name>", "Line one\nLine two & <three>"
+        )
+        deck.add_card((2, name), "main")
+
+        root = et.Element("cockatrice_deck", version="1")
+        et.SubElement(root, "deckname").text = deck.name
+        et.SubElement(root, "comments").text = deck.description
+        main = et.SubElement(root, "zone", name="main")
+        et.SubElement(root, "zone", name="side")
+        et.SubElement(main, "card", number="2", name=name)
+        path = os.path.join(self.directory, "expected.cod")
+        et.ElementTree(root).write(path, xml_declaration=True, encoding="UTF-8")
+        with open(path, "rb") as f:
+            expected = f.read()
+
+        self.assertEqual(
+            self.save_deck(architrice.targets.get("C"), deck, {}), expected
+        )
+
+
+class TestRenderDeck(common.DataDirTestCase):
+    def tearDown(self):
+        architrice.targets.card_info.find.cache_clear()
+        super().tearDown()
+
+    def testLooksUpCardInfo(self):
+        architrice.targets.card_info.insert_card_tuples(
+            [("Sol Ring", "89631", False, "263", "c21", False)]
+        )
+        architrice.targets.card_info.find.cache_clear()
+        deck = architrice.deckreprs.Deck("1", "A", "Deck", "")
+        deck.add_card((1, "Sol Ring"), "main")
+
+        self.assertEqual(
+            architrice.targets.get("X").render_deck(deck),
+            f"1 [C21:263] Sol Ring{os.linesep}".encode(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()